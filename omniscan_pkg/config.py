@@ -1,18 +1,116 @@
 import os
-import configparser
+import re
+import fnmatch
 import logging
 
-def get_config_val(config, env_key, config_section, config_key, fallback=None, cast_func=None):
-    """Get config value from env var or config.ini, with optional type casting."""
+class FastConfigParser:
+    """Minimal single-pass INI reader returning a nested {section: {key: value}} dict.
+
+    Only understands section headers, `key = value` / `key: value` entries,
+    indented continuation lines and `#`/`;` comments. There is no interpolation,
+    so values are returned verbatim (stripped).
+    """
+    SECTION_RE = re.compile(r'^\[([^\]]+)\]\s*$')
+    ENTRY_RE = re.compile(r'^([^=:\s][^=:]*)[=:](.*)$')
+
+    def parse(self, path):
+        data = {}
+        try:
+            with open(path, encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            # Match ConfigParser.read(): a missing file simply yields no values
+            return data
+
+        section = None
+        key = None
+        for raw in lines:
+            line = raw.strip()
+            if not line or line[0] in '#;':
+                continue
+
+            # Indented line following an entry continues its value (multi-line lists)
+            if raw[0] in ' \t' and key is not None:
+                data[section][key] = f"{data[section][key]}\n{line}" if data[section][key] else line
+                continue
+
+            m = self.SECTION_RE.match(line)
+            if m:
+                section = m.group(1).strip()
+                data.setdefault(section, {})
+                key = None
+                continue
+
+            m = self.ENTRY_RE.match(line)
+            if m and section is not None:
+                key = m.group(1).strip().lower()
+                data[section][key] = m.group(2).strip()
+            else:
+                key = None
+        return data
+
+# Comma- and/or newline-separated list values
+_SPLIT_RE = re.compile(r'[,\n]+')
+
+_TRUE_VALUES = frozenset(('true', '1', 'yes', 'on'))
+
+def _to_bool(value):
+    """Cast a config string to bool (true/1/yes/on, case-insensitive)."""
+    return value is True or (isinstance(value, str) and value.lower() in _TRUE_VALUES)
+
+# Parsed INI files keyed by absolute path -> (st_mtime_ns, data)
+_CFG_CACHE = {}
+
+def read_ini(config_path, copy=False):
+    """Return the parsed INI dict for config_path, re-parsing only when its mtime changes.
+
+    The cached dict is shared; pass copy=True to get one that is safe to modify
+    (e.g. before handing it to write_ini).
+    """
+    abs_path = os.path.abspath(config_path)
+    try:
+        mtime = os.stat(abs_path).st_mtime_ns
+    except OSError:
+        _CFG_CACHE.pop(abs_path, None)
+        return {}
+
+    cached = _CFG_CACHE.get(abs_path)
+    if cached and cached[0] == mtime:
+        data = cached[1]
+    else:
+        data = FastConfigParser().parse(abs_path)
+        _CFG_CACHE[abs_path] = (mtime, data)
+
+    if copy:
+        return {section: dict(values) for section, values in data.items()}
+    return data
+
+def write_ini(data, config_path):
+    """Write a {section: {key: value}} dict as INI (multi-line values become indented continuations)."""
+    lines = []
+    for section, values in data.items():
+        lines.append(f"[{section}]")
+        for key, value in values.items():
+            value = str(value).replace('\n', '\n\t')
+            lines.append(f"{key} = {value}")
+        lines.append("")
+    with open(config_path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines))
+    # Don't rely on the mtime changing: coarse-timestamp mounts can keep it identical
+    _CFG_CACHE.pop(os.path.abspath(config_path), None)
+
+def get_config_val(config, env_key, config_section, config_key, fallback=None, cast_func=None, env=None):
+    """Get config value from env var or config.ini, with optional type casting.
+
+    `env` is an optional snapshot of os.environ so callers resolving many keys
+    can avoid a getenv per option.
+    """
     # Try environment variable first
-    val = os.getenv(env_key)
+    val = (os.environ if env is None else env).get(env_key)
     
     # Try config.ini second
     if val is None:
-        try:
-            val = config.get(config_section, config_key, fallback=fallback)
-        except (configparser.NoSectionError, configparser.NoOptionError):
-            val = fallback
+        val = config.get(config_section, {}).get(config_key, fallback)
 
     # Return fallback if still None (and fallback was explicitly passed as None)
     if val is None:
@@ -27,6 +125,17 @@ def get_config_val(config, env_key, config_section, config_key, fallback=None, c
             return fallback
     return val
 
+def compile_ignore_patterns(patterns):
+    """Compile glob ignore patterns into a single alternation regex (None if empty)."""
+    patterns = [fnmatch.translate(p) for p in patterns if p.strip()]
+    if not patterns:
+        return None
+    try:
+        return re.compile('(?:' + '|'.join(patterns) + ')')
+    except re.error as e:
+        logging.error(f"Failed to compile ignore patterns: {e}")
+        return None
+
 def normalize_emby_url(url, server_type):
     """Normalize Emby URL to include the /emby prefix if not present."""
     if url and server_type == 'emby':
@@ -35,77 +144,104 @@ def normalize_emby_url(url, server_type):
             return f"{url_stripped}/emby"
     return url
 
+# MEDIA_EXTENSIONS: all file types that trigger a Plex folder scan.
+# Subtitles are included so Plex re-scans when a new .srt appears.
+MEDIA_EXTENSIONS = frozenset({
+    # Video
+    '.mp4', '.mkv', '.avi', '.mov', '.wmv', '.flv', '.webm',
+    '.m4v', '.m4p', '.m4b', '.m4r', '.3gp', '.mpg', '.mpeg',
+    '.m2v', '.m2ts', '.ts', '.vob', '.iso', '.strm',
+    # Audio
+    '.mp3', '.flac', '.m4a', '.wav', '.ogg', '.opus', '.wma',
+    # Subtitles (trigger folder scan only, not library check)
+    '.srt', '.sub', '.ass', '.vtt'
+})
+
+# Declarative table of scalar options:
+# (cfg name, env var, ini section, ini key, fallback, cast)
+_SCHEMA = (
+    ('SERVER_TYPE', 'SERVER_TYPE', 'server', 'type', 'plex', str.lower),
+    ('PLEX_URL', 'PLEX_SERVER', 'plex', 'server', None, None),
+    ('TOKEN', 'PLEX_TOKEN', 'plex', 'token', None, None),
+    ('SERVER_URL', 'SERVER_URL', 'server', 'url', None, None),
+    ('API_KEY', 'API_KEY', 'server', 'api_key', None, None),
+    ('LOG_LEVEL', 'LOG_LEVEL', 'logs', 'loglevel', 'INFO', None),
+    ('SCAN_INTERVAL', 'SCAN_INTERVAL', 'behaviour', 'scan_interval', 15, int),
+    ('RUN_INTERVAL', 'RUN_INTERVAL', 'behaviour', 'run_interval', 24, int),
+    ('DISCORD_WEBHOOK_URL', 'DISCORD_WEBHOOK_URL', 'notifications', 'discord_webhook_url', None, None),
+    ('DISCORD_MENTION_EVERYONE', 'DISCORD_MENTION_EVERYONE', 'notifications', 'mention_everyone', 'false', _to_bool),
+    ('DISCORD_MENTION_HERE', 'DISCORD_MENTION_HERE', 'notifications', 'mention_here', 'false', _to_bool),
+    ('SYMLINK_CHECK', 'SYMLINK_CHECK', 'behaviour', 'symlink_check', 'false', _to_bool),
+    ('EMPTY_TRASH', 'EMPTY_TRASH', 'behaviour', 'empty_trash', 'false', _to_bool),
+    ('NOTIFICATIONS_ENABLED', 'NOTIFICATIONS_ENABLED', 'notifications', 'enabled', 'true', _to_bool),
+    ('START_TIME', 'START_TIME', 'behaviour', 'start_time', None, None),
+    ('RUN_ON_STARTUP', 'RUN_ON_STARTUP', 'behaviour', 'run_on_startup', 'true', _to_bool),
+    ('DRY_RUN', 'DRY_RUN', 'behaviour', 'dry_run', 'false', _to_bool),
+    ('SCAN_WORKERS', 'SCAN_WORKERS', 'behaviour', 'scan_workers', 4, int),
+    ('SCAN_DEBOUNCE', 'SCAN_DEBOUNCE', 'behaviour', 'scan_debounce', 30, int),
+    ('NOTIFICATION_GROUP_WINDOW', 'NOTIFICATION_GROUP_WINDOW', 'behaviour', 'notification_group_window', 15, int),
+    ('WATCH_MODE', 'WATCH_MODE', 'behaviour', 'watch', 'false', _to_bool),
+    ('CLEANUP_DAYS', 'CLEANUP_DAYS', 'behaviour', 'cleanup_days', 10, int),
+    ('PLEX_ANALYZE', 'PLEX_ANALYZE', 'behaviour', 'plex_analyze', 'false', _to_bool),
+    ('PLEX_REFRESH', 'PLEX_REFRESH', 'behaviour', 'plex_refresh', 'false', _to_bool),
+    ('INCREMENTAL_SCAN', 'INCREMENTAL_SCAN', 'behaviour', 'incremental_scan', 'false', _to_bool),
+    ('SCAN_SINCE_DAYS', 'SCAN_SINCE_DAYS', 'behaviour', 'scan_since_days', 7, int),
+    ('SCAN_DELAY', 'SCAN_DELAY', 'behaviour', 'scan_delay', 0.0, float),
+    ('DELETION_THRESHOLD', 'DELETION_THRESHOLD', 'behaviour', 'deletion_threshold', 50, int),
+    ('ABORT_ON_MASS_DELETION', 'ABORT_ON_MASS_DELETION', 'behaviour', 'abort_on_mass_deletion', 'true', _to_bool),
+    ('INTEGRITY_CHECK', 'INTEGRITY_CHECK', 'behaviour', 'integrity_check', 'false', _to_bool),
+    ('FFPROBE_CHECK', 'FFPROBE_CHECK', 'behaviour', 'ffprobe_check', 'false', _to_bool),
+    ('QUICK_INTEGRITY_CHECK', 'QUICK_INTEGRITY_CHECK', 'behaviour', 'quick_integrity_check', 'false', _to_bool),
+    # Web Security
+    ('WEB_USERNAME', 'WEB_USERNAME', 'web', 'username', 'admin', None),
+    ('WEB_PASSWORD', 'WEB_PASSWORD', 'web', 'password', None, None),
+    # Set WEB_AUTH_DISABLED=true to allow access without login (e.g. trusted local network)
+    ('WEB_AUTH_DISABLED', 'WEB_AUTH_DISABLED', 'web', 'auth_disabled', 'false', _to_bool),
+)
+
 def load_config(config_path='config.ini'):
-    config = configparser.ConfigParser()
-    config.read(config_path)
-    
+    config = read_ini(config_path)
+    # Snapshot the environment once; also isolates this load from later env mutations
+    env = dict(os.environ)
+
     cfg = {}
 
-    # Load config with Env Var overrides
-    cfg['SERVER_TYPE'] = get_config_val(config, 'SERVER_TYPE', 'server', 'type', 'plex').lower()
-    cfg['PLEX_URL'] = get_config_val(config, 'PLEX_SERVER', 'plex', 'server')
-    cfg['TOKEN'] = get_config_val(config, 'PLEX_TOKEN', 'plex', 'token')
-    
+    # Scalar options with Env Var overrides, resolved in a single pass over _SCHEMA
+    for name, env_key, section, key, fallback, cast_func in _SCHEMA:
+        val = env.get(env_key)
+        if val is None:
+            val = config.get(section, {}).get(key, fallback)
+        if val is not None and cast_func:
+            try:
+                val = cast_func(val)
+            except (ValueError, TypeError):
+                logging.warning(f"Invalid value for {env_key}/{key}: {val}. Using fallback: {fallback}")
+                val = fallback
+        cfg[name] = val
+
     # Generic Server support (Emby/Jellyfin)
-    server_url = get_config_val(config, 'SERVER_URL', 'server', 'url')
-    cfg['SERVER_URL'] = normalize_emby_url(server_url, cfg['SERVER_TYPE'])
-    cfg['API_KEY'] = get_config_val(config, 'API_KEY', 'server', 'api_key')
-    
-    cfg['LOG_LEVEL'] = get_config_val(config, 'LOG_LEVEL', 'logs', 'loglevel', 'INFO')
-    cfg['SCAN_INTERVAL'] = get_config_val(config, 'SCAN_INTERVAL', 'behaviour', 'scan_interval', 15, int)
-    cfg['RUN_INTERVAL'] = get_config_val(config, 'RUN_INTERVAL', 'behaviour', 'run_interval', 24, int)
-    cfg['DISCORD_WEBHOOK_URL'] = get_config_val(config, 'DISCORD_WEBHOOK_URL', 'notifications', 'discord_webhook_url')
+    cfg['SERVER_URL'] = normalize_emby_url(cfg['SERVER_URL'], cfg['SERVER_TYPE'])
+
     cfg['DISCORD_AVATAR_URL'] = "https://raw.githubusercontent.com/drondeseries/omniscan/master/assets/logo.png"
     cfg['DISCORD_WEBHOOK_NAME'] = "Omniscan"
-    cfg['DISCORD_MENTION_USERS'] = [u.strip() for u in get_config_val(config, 'DISCORD_MENTION_USERS', 'notifications', 'mention_users', '').split(',') if u.strip()]
-    cfg['DISCORD_MENTION_ROLES'] = [r.strip() for r in get_config_val(config, 'DISCORD_MENTION_ROLES', 'notifications', 'mention_roles', '').split(',') if r.strip()]
-    cfg['DISCORD_MENTION_EVERYONE'] = get_config_val(config, 'DISCORD_MENTION_EVERYONE', 'notifications', 'mention_everyone', 'false', lambda x: str(x).lower() == 'true')
-    cfg['DISCORD_MENTION_HERE'] = get_config_val(config, 'DISCORD_MENTION_HERE', 'notifications', 'mention_here', 'false', lambda x: str(x).lower() == 'true')
-    cfg['DISCORD_MENTION_EVENTS'] = [e.strip().lower() for e in get_config_val(config, 'DISCORD_MENTION_EVENTS', 'notifications', 'mention_events', 'corrupt,stuck').split(',') if e.strip()]
-    
-    cfg['SYMLINK_CHECK'] = get_config_val(config, 'SYMLINK_CHECK', 'behaviour', 'symlink_check', 'false', lambda x: str(x).lower() == 'true')
-    cfg['EMPTY_TRASH'] = get_config_val(config, 'EMPTY_TRASH', 'behaviour', 'empty_trash', 'false', lambda x: str(x).lower() == 'true')
-    cfg['NOTIFICATIONS_ENABLED'] = get_config_val(config, 'NOTIFICATIONS_ENABLED', 'notifications', 'enabled', 'true', lambda x: str(x).lower() == 'true')
-    cfg['START_TIME'] = get_config_val(config, 'START_TIME', 'behaviour', 'start_time')
-    cfg['RUN_ON_STARTUP'] = get_config_val(config, 'RUN_ON_STARTUP', 'behaviour', 'run_on_startup', 'true', lambda x: str(x).lower() == 'true')
-    cfg['DRY_RUN'] = get_config_val(config, 'DRY_RUN', 'behaviour', 'dry_run', 'false', lambda x: str(x).lower() == 'true')
-    cfg['SCAN_WORKERS'] = get_config_val(config, 'SCAN_WORKERS', 'behaviour', 'scan_workers', 4, int)
-    cfg['SCAN_DEBOUNCE'] = get_config_val(config, 'SCAN_DEBOUNCE', 'behaviour', 'scan_debounce', 30, int)
-    cfg['NOTIFICATION_GROUP_WINDOW'] = get_config_val(config, 'NOTIFICATION_GROUP_WINDOW', 'behaviour', 'notification_group_window', 15, int)
-    cfg['WATCH_MODE'] = get_config_val(config, 'WATCH_MODE', 'behaviour', 'watch', 'false', lambda x: str(x).lower() == 'true')
-    cfg['CLEANUP_DAYS'] = get_config_val(config, 'CLEANUP_DAYS', 'behaviour', 'cleanup_days', 10, int)
-    cfg['PLEX_ANALYZE'] = get_config_val(config, 'PLEX_ANALYZE', 'behaviour', 'plex_analyze', 'false', lambda x: str(x).lower() == 'true')
-    cfg['PLEX_REFRESH'] = get_config_val(config, 'PLEX_REFRESH', 'behaviour', 'plex_refresh', 'false', lambda x: str(x).lower() == 'true')
-    
-    # New Features
-    cfg['INCREMENTAL_SCAN'] = get_config_val(config, 'INCREMENTAL_SCAN', 'behaviour', 'incremental_scan', 'false', lambda x: str(x).lower() == 'true')
-    cfg['SCAN_SINCE_DAYS'] = get_config_val(config, 'SCAN_SINCE_DAYS', 'behaviour', 'scan_since_days', 7, int)
-    cfg['SCAN_DELAY'] = get_config_val(config, 'SCAN_DELAY', 'behaviour', 'scan_delay', 0.0, float)
-    cfg['DELETION_THRESHOLD'] = get_config_val(config, 'DELETION_THRESHOLD', 'behaviour', 'deletion_threshold', 50, int)
-    cfg['ABORT_ON_MASS_DELETION'] = get_config_val(config, 'ABORT_ON_MASS_DELETION', 'behaviour', 'abort_on_mass_deletion', 'true', lambda x: str(x).lower() == 'true')
-    cfg['INTEGRITY_CHECK'] = get_config_val(config, 'INTEGRITY_CHECK', 'behaviour', 'integrity_check', 'false', lambda x: str(x).lower() == 'true')
-    cfg['FFPROBE_CHECK'] = get_config_val(config, 'FFPROBE_CHECK', 'behaviour', 'ffprobe_check', 'false', lambda x: str(x).lower() == 'true')
-
-    # Web Security
-    cfg['WEB_USERNAME'] = get_config_val(config, 'WEB_USERNAME', 'web', 'username', 'admin')
-    cfg['WEB_PASSWORD'] = get_config_val(config, 'WEB_PASSWORD', 'web', 'password')
-    # Set WEB_AUTH_DISABLED=true to allow access without login (e.g. trusted local network)
-    cfg['WEB_AUTH_DISABLED'] = get_config_val(config, 'WEB_AUTH_DISABLED', 'web', 'auth_disabled', 'false', lambda x: str(x).lower() == 'true')
+    cfg['DISCORD_MENTION_USERS'] = [u.strip() for u in get_config_val(config, 'DISCORD_MENTION_USERS', 'notifications', 'mention_users', '', env=env).split(',') if u.strip()]
+    cfg['DISCORD_MENTION_ROLES'] = [r.strip() for r in get_config_val(config, 'DISCORD_MENTION_ROLES', 'notifications', 'mention_roles', '', env=env).split(',') if r.strip()]
+    cfg['DISCORD_MENTION_EVENTS'] = [e.strip().lower() for e in get_config_val(config, 'DISCORD_MENTION_EVENTS', 'notifications', 'mention_events', 'corrupt,stuck', env=env).split(',') if e.strip()]
 
     # Parse Directories
-    directories_raw = get_config_val(config, 'SCAN_DIRECTORIES', 'scan', 'directories', '')
-    cfg['SCAN_PATHS'] = [path.strip() for path in directories_raw.replace('\n', ',').split(',') if path.strip()]
+    directories_raw = get_config_val(config, 'SCAN_DIRECTORIES', 'scan', 'directories', '', env=env)
+    cfg['SCAN_PATHS'] = [path.strip() for path in _SPLIT_RE.split(directories_raw) if path.strip()]
     if cfg['SCAN_PATHS']:
         cfg['SCAN_PATHS'].sort()
 
     # Parse Watch Directories (folders to enable real-time watching on)
-    watch_dirs_raw = get_config_val(config, 'WATCH_DIRECTORIES', 'scan', 'watch_directories', '')
-    cfg['WATCH_DIRECTORIES'] = [path.strip() for path in watch_dirs_raw.replace('\n', ',').split(',') if path.strip()]
+    watch_dirs_raw = get_config_val(config, 'WATCH_DIRECTORIES', 'scan', 'watch_directories', '', env=env)
+    cfg['WATCH_DIRECTORIES'] = [path.strip() for path in _SPLIT_RE.split(watch_dirs_raw) if path.strip()]
     if cfg['WATCH_DIRECTORIES']:
         cfg['WATCH_DIRECTORIES'].sort()
 
     # Parse Path Rewrites (from Autopulse features)
-    rewrites_raw = get_config_val(config, 'PATH_REWRITES', 'rewrite', 'mappings', '')
+    rewrites_raw = get_config_val(config, 'PATH_REWRITES', 'rewrite', 'mappings', '', env=env)
     cfg['PATH_REWRITES'] = []
     for line in rewrites_raw.replace(',', '\n').split('\n'):
         line = line.strip()
@@ -116,21 +252,11 @@ def load_config(config_path='config.ini'):
             cfg['PATH_REWRITES'].append((parts[0].strip(), parts[1].strip()))
 
     # Parse Ignore Patterns
-    ignore_patterns_raw = get_config_val(config, 'IGNORE_PATTERNS', 'ignore', 'patterns', '')
-    cfg['IGNORE_PATTERNS'] = [p.strip() for p in ignore_patterns_raw.replace('\n', ',').split(',') if p.strip()]
+    ignore_patterns_raw = get_config_val(config, 'IGNORE_PATTERNS', 'ignore', 'patterns', '', env=env)
+    cfg['IGNORE_PATTERNS'] = [p.strip() for p in _SPLIT_RE.split(ignore_patterns_raw) if p.strip()]
+    cfg['IGNORE_RE'] = compile_ignore_patterns(cfg['IGNORE_PATTERNS'])
     
-    # MEDIA_EXTENSIONS: all file types that trigger a Plex folder scan.
-    # Subtitles are included so Plex re-scans when a new .srt appears.
-    cfg['MEDIA_EXTENSIONS'] = {
-        # Video
-        '.mp4', '.mkv', '.avi', '.mov', '.wmv', '.flv', '.webm',
-        '.m4v', '.m4p', '.m4b', '.m4r', '.3gp', '.mpg', '.mpeg',
-        '.m2v', '.m2ts', '.ts', '.vob', '.iso', '.strm',
-        # Audio
-        '.mp3', '.flac', '.m4a', '.wav', '.ogg', '.opus', '.wma',
-        # Subtitles (trigger folder scan only, not library check)
-        '.srt', '.sub', '.ass', '.vtt'
-    }
+    cfg['MEDIA_EXTENSIONS'] = MEDIA_EXTENSIONS
 
     # Default LIBRARY_EXTENSIONS: file types that the media server actually
     # indexes as individual library items. Only these are checked against
@@ -153,11 +279,11 @@ def load_config(config_path='config.ini'):
     )
     library_ext_raw = get_config_val(
         config, 'LIBRARY_EXTENSIONS', 'scan', 'library_extensions',
-        _DEFAULT_LIBRARY_EXTENSIONS
+        _DEFAULT_LIBRARY_EXTENSIONS, env=env
     )
     cfg['LIBRARY_EXTENSIONS'] = {
         e.strip().lower() if e.strip().startswith('.') else '.' + e.strip().lower()
-        for e in library_ext_raw.replace('\n', ',').split(',')
+        for e in _SPLIT_RE.split(library_ext_raw)
         if e.strip()
     }
 
@@ -1,5 +1,4 @@
 import os
-import time
 import logging
 import logging.handlers
 import schedule
@@ -35,7 +34,10 @@ def setup_logging(config):
     log_dir = os.getcwd()
     log_file = os.path.join(log_dir, 'omniscan.log')
     
-    handlers = [logging.StreamHandler(sys.stdout)]
+    formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s', datefmt='%d %b %Y | %I:%M:%S %p')
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+    handlers = [stream_handler]
     
     # Add file handler with error handling
     try:
@@ -46,7 +48,7 @@ def setup_logging(config):
             file_handler = logging.handlers.RotatingFileHandler(
                 log_file, maxBytes=5*1024*1024, backupCount=5, encoding='utf-8', delay=True
             )
-            file_handler.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(message)s', datefmt='%d %b %Y | %I:%M:%S %p'))
+            file_handler.setFormatter(formatter)
             handlers.append(file_handler)
             # print(f"DEBUG: File logging initialized for {log_file}")
     except Exception as e:
@@ -54,8 +56,6 @@ def setup_logging(config):
 
     logging.basicConfig(
         level=getattr(logging, config['LOG_LEVEL'].upper()),
-        format='%(asctime)s [%(levelname)s] %(message)s',
-        datefmt='%d %b %Y | %I:%M:%S %p',
         handlers=handlers,
         force=True 
     )
@@ -137,7 +137,7 @@ def main():
                 for library_id, folder_path in sorted_folders:
                      scanner.trigger_scan(library_id, folder_path)
             
-            stats.send_discord_summary()
+            stats.send_discord_summary(tracker)
             
         else:
             logger.error(f"Path not found: {path}")
@@ -187,10 +187,16 @@ def main():
     else:
         schedule.every(config['RUN_INTERVAL']).hours.do(scanner.run_scan)
 
+    # Sleep until the next scheduled job instead of polling every second; the
+    # signal handler sets stop_event, which wakes the wait immediately.
     while not stop_event.is_set():
         schedule.run_pending()
-        time.sleep(1)
+        delay = schedule.idle_seconds()
+        if delay is None:
+            delay = 3600
+        stop_event.wait(max(0, min(delay, 60)))
     
+    scanner.history.close()
     logger.info("👋 Omniscan shutdown complete.")
 
 if __name__ == '__main__':
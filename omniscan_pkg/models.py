@@ -2,119 +2,284 @@ import json
 import sqlite3
 import os
 import threading
+import time
 import logging
 from collections import defaultdict
 from datetime import datetime
-from contextlib import closing
-from .notifications import truncate_field_value, send_discord_webhook_sync, format_file_list
+from .notifications import truncate_field_value, queue_discord_webhook, format_file_list
 from discord import Embed, Color
 
 logger = logging.getLogger(__name__)
 
 class StuckFileTracker:
+    # Number of add_event calls between retention sweeps
+    PRUNE_EVERY = 500
+
+    # Hot statements are kept as class constants: sqlite3 caches prepared statements per
+    # connection keyed by SQL text, so with per-thread connections each is parsed once.
+    # Events carry the epoch time they were logged; SQLite formats it in local time so
+    # history keeps the wall-clock the UI has always shown (CURRENT_TIMESTAMP is UTC).
+    INSERT_EVENT_SQL = (
+        "INSERT INTO events (timestamp, event_type, details, status, metadata) "
+        "VALUES (datetime(?, 'unixepoch', 'localtime'), ?, ?, ?, ?)"
+    )
+
+    # Events are buffered and written with one executemany per this many calls
+    EVENT_BUFFER_LIMIT = 500
+
+    # RETURNING needs SQLite >= 3.35; older builds read the count back with a SELECT
+    UPSERT_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+    UPSERT_ATTEMPT_SQL = (
+        'INSERT INTO stuck_files (path, attempts) VALUES (?, 1) '
+        'ON CONFLICT(path) DO UPDATE SET attempts = attempts + 1, last_seen = CURRENT_TIMESTAMP'
+        + (' RETURNING attempts' if UPSERT_RETURNING else '')
+    )
+
+    DELETE_STUCK_SQL = 'DELETE FROM stuck_files WHERE path = ?'
+
+    # One statement for both the plain and LIKE-filtered listing keeps the cached text stable
+    HISTORY_SQL = (
+        'SELECT timestamp, event_type, details, status FROM events '
+        'WHERE (:s IS NULL OR details LIKE :s OR event_type LIKE :s) '
+        'ORDER BY id DESC LIMIT :limit OFFSET :offset'
+    )
+
+    HISTORY_FTS_SQL = (
+        'SELECT timestamp, event_type, details, status FROM events '
+        'WHERE id IN (SELECT rowid FROM events_fts WHERE events_fts MATCH :q) '
+        'ORDER BY id DESC LIMIT :limit OFFSET :offset'
+    )
+
     def __init__(self, db_file='history.db', config=None):
         self.db_file = db_file
         self.config = config or {}
         self.max_retries = 3
+        # Serializes writers only; readers rely on WAL and their own per-thread connection
         self.lock = threading.Lock()
         self.stuck_paths = set()
+        # One long-lived connection per thread instead of a connect/close per call
+        self._local = threading.local()
+        self._conns = {}  # thread ident -> connection, so dead threads' handles can be closed
+        self._conns_lock = threading.Lock()
+        self._event_buffer = []
+        self._buffer_lock = threading.Lock()
         self._init_db()
 
+    def _conn(self):
+        """Return this thread's SQLite connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, check_same_thread=False, cached_statements=128)
+            if self.db_file != ':memory:':
+                # Enable WAL mode for better concurrency
+                conn.execute('PRAGMA journal_mode=WAL;')
+            conn.execute('PRAGMA synchronous=NORMAL;')
+            conn.execute('PRAGMA temp_store=MEMORY;')
+            conn.execute('PRAGMA cache_size=-8000;')  # 8 MiB page cache
+            self._local.conn = conn
+            with self._conns_lock:
+                # Short-lived threads (e.g. one per manual scan) would otherwise leave
+                # their connection open for the lifetime of the tracker.
+                alive = {t.ident for t in threading.enumerate()}
+                stale = [ident for ident in self._conns if ident not in alive]
+                stale = [self._conns.pop(ident) for ident in stale]
+                # A recycled ident means its previous owner is gone too
+                previous = self._conns.pop(threading.get_ident(), None)
+                if previous is not None:
+                    stale.append(previous)
+                self._conns[threading.get_ident()] = conn
+            for old in stale:
+                self._close_conn(old)
+        return conn
+
+    def _close_conn(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"DB Error closing connection: {e}")
+
+    def close(self):
+        """Close every thread's connection; later calls transparently reopen."""
+        self.flush()
+        with self._conns_lock:
+            conns, self._conns = self._conns, {}
+            self._local = threading.local()
+        for i, conn in enumerate(conns.values()):
+            if i == 0:
+                # Let SQLite refresh planner statistics for the indexes it actually used
+                try:
+                    conn.execute('PRAGMA optimize;')
+                except sqlite3.Error as e:
+                    logger.warning(f"DB Error optimizing: {e}")
+            self._close_conn(conn)
+
     def _init_db(self):
         self.prune_counter = 0
+        self.fts_enabled = False
         with self.lock:
             try:
-                with closing(sqlite3.connect(self.db_file)) as conn:
-                    # Enable WAL mode for better concurrency
-                    conn.execute('PRAGMA journal_mode=WAL;')
-                    with conn:
-                        conn.execute('''
-                            CREATE TABLE IF NOT EXISTS stuck_files (
-                                path TEXT PRIMARY KEY,
-                                attempts INTEGER DEFAULT 0,
-                                last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                            )
-                        ''')
-                        conn.execute('''
-                            CREATE TABLE IF NOT EXISTS events (
-                                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                                event_type TEXT,
-                                details TEXT,
-                                status TEXT,
-                                metadata TEXT
-                            )
-                        ''')
-                        # Migration: Add metadata column if it doesn't exist
-                        columns = [info[1] for info in conn.execute('PRAGMA table_info(events)').fetchall()]
-                        if 'metadata' not in columns:
-                            conn.execute('ALTER TABLE events ADD COLUMN metadata TEXT')
-                            logger.info("Database migrated: added 'metadata' column to 'events' table.")
+                conn = self._conn()
+                with conn:
+                    conn.execute('''
+                        CREATE TABLE IF NOT EXISTS stuck_files (
+                            path TEXT PRIMARY KEY,
+                            attempts INTEGER DEFAULT 0,
+                            last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                        )
+                    ''')
+                    conn.execute('''
+                        CREATE TABLE IF NOT EXISTS events (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                            event_type TEXT,
+                            details TEXT,
+                            status TEXT,
+                            metadata TEXT
+                        )
+                    ''')
+                    # Migration: Add metadata column if it doesn't exist
+                    columns = {info[1] for info in conn.execute('PRAGMA table_info(events)')}
+                    if 'metadata' not in columns:
+                        conn.execute('ALTER TABLE events ADD COLUMN metadata TEXT')
+                        logger.info("Database migrated: added 'metadata' column to 'events' table.")
+                    # get_all_stuck/retention sweeps order and filter by last_seen; the
+                    # dashboard's corrupt count filters events by type
+                    conn.execute('CREATE INDEX IF NOT EXISTS idx_stuck_files_last_seen ON stuck_files(last_seen)')
+                    conn.execute('CREATE INDEX IF NOT EXISTS idx_events_event_type ON events(event_type)')
+
+                self._init_fts(conn)
                     
-                    # Cache stuck paths in memory
-                    cursor = conn.cursor()
-                    cursor.execute('SELECT path FROM stuck_files')
-                    self.stuck_paths = {row[0] for row in cursor.fetchall()}
+                # Cache stuck paths in memory, streaming rows straight off the cursor
+                self.stuck_paths = {row[0] for row in conn.execute('SELECT path FROM stuck_files')}
             except Exception as e:
                 logger.error(f"Failed to init DB: {e}")
 
+    def _init_fts(self, conn):
+        """Create the FTS5 search index over events (trigram tokenizer keeps LIKE-style substring matching)."""
+        self.fts_enabled = False
+        try:
+            exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'events_fts'").fetchone()
+            with conn:
+                conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5("
+                    "details, event_type, content='events', content_rowid='id', tokenize='trigram')"
+                )
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events BEGIN
+                        INSERT INTO events_fts(rowid, details, event_type) VALUES (new.id, new.details, new.event_type);
+                    END
+                ''')
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events BEGIN
+                        INSERT INTO events_fts(events_fts, rowid, details, event_type) VALUES ('delete', old.id, old.details, old.event_type);
+                    END
+                ''')
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS events_fts_au AFTER UPDATE ON events BEGIN
+                        INSERT INTO events_fts(events_fts, rowid, details, event_type) VALUES ('delete', old.id, old.details, old.event_type);
+                        INSERT INTO events_fts(rowid, details, event_type) VALUES (new.id, new.details, new.event_type);
+                    END
+                ''')
+                if not exists:
+                    # Index events logged before the search table existed
+                    conn.execute("INSERT INTO events_fts(events_fts) VALUES ('rebuild')")
+                    logger.info("Database migrated: built full-text search index for 'events'.")
+            self.fts_enabled = True
+        except sqlite3.Error as e:
+            logger.warning(f"Full-text search unavailable, history search will use LIKE: {e}")
+
     def add_event(self, event_type, details, status, metadata=None):
-        """Add an event to the history log, optionally storing rich metadata."""
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        """Add an event to the history log, optionally storing rich metadata.
+
+        Events are buffered and written in batches; readers flush first, so the
+        buffer is never visible as missing history.
+        """
         metadata_json = json.dumps(metadata) if metadata else None
-        with self.lock:
-            try:
-                with closing(sqlite3.connect(self.db_file)) as conn:
-                    with conn:
-                        conn.execute('INSERT INTO events (timestamp, event_type, details, status, metadata) VALUES (?, ?, ?, ?, ?)', (timestamp, event_type, details, status, metadata_json))
-
-                        # Prune old events and stuck files older than cleanup_days
-                        self.prune_counter += 1
-                        if self.prune_counter >= 100:
-                            cleanup_days = self.config.get('CLEANUP_DAYS', 10) if hasattr(self, 'config') else 10
-                            conn.execute("DELETE FROM events WHERE timestamp < datetime('now', ?)", (f"-{cleanup_days} days",))
-                            conn.execute("DELETE FROM stuck_files WHERE last_seen < datetime('now', ?)", (f"-{cleanup_days} days",))
-                            self.prune_counter = 0
-            except Exception as e:
-                logger.error(f"DB Error adding event: {e}")
+        with self._buffer_lock:
+            self._event_buffer.append((time.time(), event_type, details, status, metadata_json))
+            if len(self._event_buffer) < self.EVENT_BUFFER_LIMIT:
+                return
+            batch, self._event_buffer = self._event_buffer, []
+        self._write_events(batch)
+
+    def flush(self):
+        """Write any buffered events to the database."""
+        if not self._event_buffer:
+            return
+        # Only the swap is locked, so readers never wait on the writer lock
+        with self._buffer_lock:
+            batch, self._event_buffer = self._event_buffer, []
+        self._write_events(batch)
+
+    def _write_events(self, batch):
+        """Insert a batch of buffered events in one transaction."""
+        if not batch:
+            return
+        try:
+            conn = self._conn()
+            with conn:
+                conn.executemany(self.INSERT_EVENT_SQL, batch)
+
+            # Retention sweeps run in their own transaction so the insert commits on its own
+            with self._buffer_lock:
+                self.prune_counter += len(batch)
+                due = self.prune_counter >= self.PRUNE_EVERY
+                if due:
+                    self.prune_counter = 0
+            if due:
+                self._prune(conn)
+        except Exception as e:
+            logger.error(f"DB Error adding events: {e}")
+
+    def _prune(self, conn):
+        """Drop events and stuck files older than cleanup_days."""
+        cutoff = f"-{self.config.get('CLEANUP_DAYS', 10)} days"
+        with conn:
+            # Events are appended in time order, so find the first id still inside the
+            # retention window (walking the rowid from the oldest end) and drop everything
+            # below it as a primary-key range instead of scanning every timestamp.
+            conn.execute(
+                "DELETE FROM events WHERE id < COALESCE("
+                "(SELECT id FROM events WHERE timestamp >= datetime('now', 'localtime', ?) ORDER BY id LIMIT 1), "
+                "(SELECT MAX(id) + 1 FROM events))",
+                (cutoff,)
+            )
+            conn.execute("DELETE FROM stuck_files WHERE last_seen < datetime('now', ?)", (cutoff,))
 
     def get_history(self, limit=50, offset=0, search=None):
         """Get recent history events, optionally filtered by search term."""
-        with self.lock:
-            try:
-                with closing(sqlite3.connect(self.db_file)) as conn:
-                    cursor = conn.cursor()
-                    if search:
-                        search_term = f"%{search}%"
-                        cursor.execute('SELECT timestamp, event_type, details, status FROM events WHERE details LIKE ? OR event_type LIKE ? ORDER BY id DESC LIMIT ? OFFSET ?', (search_term, search_term, limit, offset))
-                    else:
-                        cursor.execute('SELECT timestamp, event_type, details, status FROM events ORDER BY id DESC LIMIT ? OFFSET ?', (limit, offset))
-                    return cursor.fetchall()
-            except Exception as e:
-                logger.error(f"DB Error fetching history: {e}")
-                return []
+        self.flush()
+        try:
+            conn = self._conn()
+            cursor = conn.cursor()
+            if search and self.fts_enabled and len(search) >= 3:
+                # Trigram index needs at least 3 characters; quote the term so it is matched literally
+                fts_query = '"' + search.replace('"', '""') + '"'
+                cursor.execute(self.HISTORY_FTS_SQL, {'q': fts_query, 'limit': limit, 'offset': offset})
+            else:
+                search_term = f"%{search}%" if search else None
+                cursor.execute(self.HISTORY_SQL, {'s': search_term, 'limit': limit, 'offset': offset})
+            return cursor.fetchall()
+        except Exception as e:
+            logger.error(f"DB Error fetching history: {e}")
+            return []
 
     def save_history(self):
-        # No-op for compatibility with existing code calling save_history
-        pass
+        """Persist buffered events (kept under its old name for existing callers)."""
+        self.flush()
 
     def increment_attempt(self, file_path):
         """Increment retry count for a file. Returns True if max retries exceeded."""
         with self.lock:
             try:
-                with closing(sqlite3.connect(self.db_file)) as conn:
-                    cursor = conn.cursor()
-                    cursor.execute('SELECT attempts FROM stuck_files WHERE path = ?', (file_path,))
-                    row = cursor.fetchone()
-                    
-                    with conn:
-                        if row:
-                            attempts = row[0] + 1
-                            cursor.execute('UPDATE stuck_files SET attempts = ?, last_seen = CURRENT_TIMESTAMP WHERE path = ?', (attempts, file_path))
-                        else:
-                            attempts = 1
-                            cursor.execute('INSERT INTO stuck_files (path, attempts) VALUES (?, ?)', (file_path, attempts))
-                    
+                conn = self._conn()
+                with conn:
+                    # Insert with attempts=1 or bump the existing row in one statement
+                    cursor = conn.execute(self.UPSERT_ATTEMPT_SQL, (file_path,))
+                    if not self.UPSERT_RETURNING:
+                        cursor = conn.execute('SELECT attempts FROM stuck_files WHERE path = ?', (file_path,))
+                    attempts = cursor.fetchone()[0]
+
                 self.stuck_paths.add(file_path)
                 return attempts > self.max_retries
             except Exception as e:
@@ -127,73 +292,70 @@ class StuckFileTracker:
             if file_path not in self.stuck_paths:
                 return
             try:
-                with closing(sqlite3.connect(self.db_file)) as conn:
-                    with conn:
-                        conn.execute('DELETE FROM stuck_files WHERE path = ?', (file_path,))
+                conn = self._conn()
+                with conn:
+                    conn.execute(self.DELETE_STUCK_SQL, (file_path,))
                 self.stuck_paths.discard(file_path)
             except Exception as e:
                 logger.error(f"DB Error clearing {file_path}: {e}")
 
     def get_all_stuck(self):
         """Return a list of all files with any retry attempts."""
-        with self.lock:
-            try:
-                with closing(sqlite3.connect(self.db_file)) as conn:
-                    cursor = conn.cursor()
-                    cursor.execute('SELECT path, attempts, last_seen FROM stuck_files ORDER BY last_seen DESC')
-                    return cursor.fetchall()
-            except Exception as e:
-                logger.error(f"DB Error fetching stuck files: {e}")
-                return []
+        try:
+            conn = self._conn()
+            cursor = conn.cursor()
+            cursor.execute('SELECT path, attempts, last_seen FROM stuck_files ORDER BY last_seen DESC')
+            return cursor.fetchall()
+        except Exception as e:
+            logger.error(f"DB Error fetching stuck files: {e}")
+            return []
 
     def get_truly_stuck(self):
         """Return only files that have exceeded max_retries — these are the genuinely stuck files
         that match what is reported in Discord notifications (stats.stuck_items)."""
-        with self.lock:
-            try:
-                with closing(sqlite3.connect(self.db_file)) as conn:
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        'SELECT path, attempts, last_seen FROM stuck_files WHERE attempts >= ? ORDER BY last_seen DESC',
-                        (self.max_retries,)
-                    )
-                    return cursor.fetchall()
-            except Exception as e:
-                logger.error(f"DB Error fetching truly stuck files: {e}")
-                return []
+        try:
+            conn = self._conn()
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT path, attempts, last_seen FROM stuck_files WHERE attempts >= ? ORDER BY last_seen DESC',
+                (self.max_retries,)
+            )
+            return cursor.fetchall()
+        except Exception as e:
+            logger.error(f"DB Error fetching truly stuck files: {e}")
+            return []
 
     def get_truly_stuck_count(self):
         """Fast count of files with attempts >= max_retries."""
-        with self.lock:
-            try:
-                with closing(sqlite3.connect(self.db_file)) as conn:
-                    cursor = conn.cursor()
-                    cursor.execute('SELECT COUNT(*) FROM stuck_files WHERE attempts >= ?', (self.max_retries,))
-                    return cursor.fetchone()[0]
-            except Exception as e:
-                logger.error(f"DB Error counting stuck files: {e}")
-                return 0
+        try:
+            conn = self._conn()
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*) FROM stuck_files WHERE attempts >= ?', (self.max_retries,))
+            return cursor.fetchone()[0]
+        except Exception as e:
+            logger.error(f"DB Error counting stuck files: {e}")
+            return 0
 
 
     def get_corrupt_count(self):
         """Return the total number of corrupt files logged."""
-        with self.lock:
-            try:
-                with closing(sqlite3.connect(self.db_file)) as conn:
-                    cursor = conn.cursor()
-                    cursor.execute("SELECT COUNT(*) FROM events WHERE event_type = 'Corrupt'")
-                    return cursor.fetchone()[0]
-            except Exception as e:
-                logger.error(f"DB Error fetching corrupt count: {e}")
-                return 0
+        self.flush()
+        try:
+            conn = self._conn()
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM events WHERE event_type = 'Corrupt'")
+            return cursor.fetchone()[0]
+        except Exception as e:
+            logger.error(f"DB Error fetching corrupt count: {e}")
+            return 0
 
     def clear_all_stuck(self):
         """Clear all entries from the stuck files database."""
         with self.lock:
             try:
-                with closing(sqlite3.connect(self.db_file)) as conn:
-                    with conn:
-                        conn.execute('DELETE FROM stuck_files')
+                conn = self._conn()
+                with conn:
+                    conn.execute('DELETE FROM stuck_files')
                 self.stuck_paths.clear()
                 return True
             except Exception as e:
@@ -202,64 +364,138 @@ class StuckFileTracker:
 
     def clear_all_events(self):
         """Clear all entries from the events table."""
+        with self._buffer_lock:
+            self._event_buffer = []
         with self.lock:
             try:
-                with closing(sqlite3.connect(self.db_file)) as conn:
-                    with conn:
-                        conn.execute('DELETE FROM events')
+                conn = self._conn()
+                with conn:
+                    conn.execute('DELETE FROM events')
                 return True
             except Exception as e:
                 logger.error(f"DB Error clearing all events: {e}")
                 return False
 
 
+class _StatsBucket:
+    """Per-thread RunStats accumulator; only ever written by its owning thread."""
+    __slots__ = ('missing_counts', 'missing_samples', 'stuck_items', 'corrupt_items', 'corrupt_labels', 'total_scanned', 'broken_symlinks')
+
+    def __init__(self):
+        self.missing_counts = defaultdict(int)
+        self.missing_samples = defaultdict(list)
+        self.stuck_items = []
+        self.corrupt_items = []
+        self.corrupt_labels = []
+        self.total_scanned = 0
+        self.broken_symlinks = 0
+
+
 class RunStats:
+    # Example paths kept per library for the Discord summaries
+    MISSING_SAMPLE_SIZE = 10
+
     def __init__(self, config):
         self.config = config
         self.start_time = datetime.now()
-        self.missing_items = defaultdict(list)
-        self.stuck_items = []
-        self.corrupt_items = []
         self.errors = []
         self.warnings = []
-        self.total_scanned = 0
-        self.total_missing = 0
-        self.broken_symlinks = 0
         self.lock = threading.Lock()
+        # Scan workers record into their own bucket so the per-file hot path takes no lock;
+        # the public totals below merge all buckets when read.
+        self._tls = threading.local()
+        self._buckets = []
+
+    def _bucket(self):
+        bucket = getattr(self._tls, 'bucket', None)
+        if bucket is None:
+            bucket = _StatsBucket()
+            self._tls.bucket = bucket
+            with self.lock:
+                self._buckets.append(bucket)
+        return bucket
+
+    @property
+    def missing_counts(self):
+        """Number of missing files per library."""
+        merged = defaultdict(int)
+        for bucket in list(self._buckets):
+            for library_name, count in list(bucket.missing_counts.items()):
+                merged[library_name] += count
+        return merged
+
+    @property
+    def missing_samples(self):
+        """Up to MISSING_SAMPLE_SIZE example paths per library, for notifications."""
+        merged = defaultdict(list)
+        for bucket in list(self._buckets):
+            for library_name, items in list(bucket.missing_samples.items()):
+                room = self.MISSING_SAMPLE_SIZE - len(merged[library_name])
+                merged[library_name].extend(items[:room])
+        return merged
+
+    @property
+    def stuck_items(self):
+        return [item for bucket in list(self._buckets) for item in bucket.stuck_items]
+
+    @property
+    def corrupt_items(self):
+        return [item for bucket in list(self._buckets) for item in bucket.corrupt_items]
+
+    @property
+    def corrupt_labels(self):
+        """Display strings for corrupt_items, formatted once when each item was recorded."""
+        return [label for bucket in list(self._buckets) for label in bucket.corrupt_labels]
+
+    @property
+    def total_scanned(self):
+        return sum(bucket.total_scanned for bucket in list(self._buckets))
+
+    @property
+    def total_missing(self):
+        return sum(count for bucket in list(self._buckets) for count in list(bucket.missing_counts.values()))
+
+    @property
+    def broken_symlinks(self):
+        return sum(bucket.broken_symlinks for bucket in list(self._buckets))
 
     def add_missing_item(self, library_name, file_path):
-        with self.lock:
-            self.missing_items[library_name].append(file_path)
-            self.total_missing += 1
+        # Only a bounded sample of paths is kept; notifications show at most this many
+        bucket = self._bucket()
+        bucket.missing_counts[library_name] += 1
+        samples = bucket.missing_samples[library_name]
+        if len(samples) < self.MISSING_SAMPLE_SIZE:
+            samples.append(file_path)
 
     def add_stuck_item(self, file_path):
-        with self.lock:
-            self.stuck_items.append(file_path)
+        self._bucket().stuck_items.append(file_path)
 
     def add_corrupt_item(self, file_path, reason):
-        with self.lock:
-            self.corrupt_items.append((file_path, reason))
+        bucket = self._bucket()
+        bucket.corrupt_items.append((file_path, reason))
+        bucket.corrupt_labels.append(f"{file_path} ({reason})")
 
+    # list.append is atomic under the GIL, so these need no lock either
     def add_error(self, error):
-        with self.lock:
-            self.errors.append(error)
+        self.errors.append(error)
 
     def add_warning(self, warning):
-        with self.lock:
-            self.warnings.append(warning)
+        self.warnings.append(warning)
 
     def increment_scanned(self):
-        with self.lock:
-            self.total_scanned += 1
+        self._bucket().total_scanned += 1
 
     def increment_broken_symlinks(self):
-        with self.lock:
-            self.broken_symlinks += 1
+        self._bucket().broken_symlinks += 1
 
     def get_run_time(self):
         return datetime.now() - self.start_time
 
-    def send_discord_summary(self):
+    def send_discord_summary(self, tracker=None):
+        # Make the run's buffered history events visible before reporting on them
+        if tracker is not None:
+            tracker.flush()
+
         if self.config.get('DRY_RUN'):
             logger.info("[DRY RUN] 📢 Would send Discord summary notification")
             return
@@ -274,6 +510,14 @@ class RunStats:
             return
 
         try:
+            # Merge the per-thread buckets once for this message
+            missing_counts = self.missing_counts
+            missing_samples = self.missing_samples
+            stuck_items = self.stuck_items
+            corrupt_labels = self.corrupt_labels
+            total_missing = sum(missing_counts.values())
+            broken_symlinks = self.broken_symlinks
+
             # Create embed
             embed = Embed(
                 title="📊 Omniscan Scan Summary",
@@ -284,41 +528,40 @@ class RunStats:
             # Add overview
             embed.description = (
                f"**Scan Complete**\n"
-               f"Found **{self.total_missing}** missing items\n"
+               f"Found **{total_missing}** missing items\n"
                f"Scanned **{self.total_scanned}** total files"
             )
 
             # Add broken symlinks summary if any
-            if self.broken_symlinks > 0:
+            if broken_symlinks > 0:
                 embed.add_field(
                     name="⚠️ Issues Detected",
-                    value=f"Broken Symlinks Skipped: **{self.broken_symlinks}**",
+                    value=f"Broken Symlinks Skipped: **{broken_symlinks}**",
                     inline=False
                 )
 
             # Add stuck items summary
-            if self.stuck_items:
+            if stuck_items:
                 embed.add_field(
-                    name=f"⛔ Stuck Files ({len(self.stuck_items)})",
-                    value=format_file_list(self.stuck_items, prefix="! ", code_block=True),
+                    name=f"⛔ Stuck Files ({len(stuck_items)})",
+                    value=format_file_list(stuck_items, prefix="! ", code_block=True),
                     inline=False
                 )
 
             # Add corrupt items summary
-            if self.corrupt_items:
-                corrupt_list = [f"{path} ({reason})" for path, reason in self.corrupt_items]
+            if corrupt_labels:
                 embed.add_field(
-                    name=f"❌ Corrupt Files ({len(self.corrupt_items)})",
-                    value=format_file_list(corrupt_list, prefix="x ", code_block=True),
+                    name=f"❌ Corrupt Files ({len(corrupt_labels)})",
+                    value=format_file_list(corrupt_labels, prefix="x ", code_block=True),
                     inline=False
                 )
 
             # Add library-specific stats
-            for library, items in self.missing_items.items():
+            for library, count in missing_counts.items():
                 lib_name = library or "Unknown Library"
                 embed.add_field(
-                    name=f"📁 {lib_name} ({len(items)})",
-                    value=format_file_list(items, max_items=5, prefix="• ", code_block=True),
+                    name=f"📁 {lib_name} ({count})",
+                    value=format_file_list(missing_samples[library], max_items=5, prefix="• ", code_block=True, total=count),
                     inline=False
                 )
 
@@ -327,14 +570,14 @@ class RunStats:
 
             # Determine event_type for Discord mentions
             event_type = 'update'
-            if self.stuck_items:
+            if stuck_items:
                 event_type = 'stuck'
-            if self.corrupt_items:
+            if corrupt_labels:
                 event_type = 'corrupt'
 
-            # Send webhook
-            if send_discord_webhook_sync(webhook_url, embed, self.config, event_type=event_type):
-                logger.info("✅ Discord notification sent successfully")
+            # Send webhook from the background notifier so the scan can finish
+            queue_discord_webhook(webhook_url, embed, self.config, event_type=event_type,
+                                  success_message="✅ Discord notification sent successfully")
 
         except Exception as e:
             logger.error(f"Failed to send Discord notification: {str(e)}")
@@ -352,6 +595,10 @@ class RunStats:
             return
 
         try:
+            missing_counts = self.missing_counts
+            missing_samples = self.missing_samples
+            total_missing = sum(missing_counts.values())
+
             est_seconds = folders_count * 10 
             est_minutes = est_seconds // 60
             est_sec_remainder = est_seconds % 60
@@ -366,20 +613,20 @@ class RunStats:
 
             embed.add_field(
                 name="📊 Overview",
-                value=f"Found **{self.total_missing}** missing items.",
+                value=f"Found **{total_missing}** missing items.",
                 inline=False
             )
 
-            for library, items in self.missing_items.items():
+            for library, count in missing_counts.items():
                 embed.add_field(
-                    name=f"📁 {library} ({len(items)} items)",
-                    value=format_file_list(items, max_items=10, prefix="• ", code_block=True),
+                    name=f"📁 {library} ({count} items)",
+                    value=format_file_list(missing_samples[library], max_items=10, prefix="• ", code_block=True, total=count),
                     inline=False
                 )
 
             embed.set_footer(text="Omniscan Media Monitor")
-            if send_discord_webhook_sync(webhook_url, embed, self.config):
-                logger.info("✅ Pending scan notification sent successfully")
+            queue_discord_webhook(webhook_url, embed, self.config,
+                                  success_message="✅ Pending scan notification sent successfully")
 
         except Exception as e:
             logger.error(f"Failed to send pending notification: {str(e)}")
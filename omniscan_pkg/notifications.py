@@ -1,42 +1,113 @@
+import atexit
 import logging
 import os
+import queue
+import threading
 import time
 import requests
+from requests.adapters import HTTPAdapter
 import json
 from datetime import datetime
 from discord import Embed, Color
 
 logger = logging.getLogger(__name__)
 
+# Shared keep-alive session so every webhook reuses the pooled TLS connection to discord.com
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Return the process-wide requests.Session used for Discord webhooks."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                # Webhooks only ever talk to one host; retries stay in send_discord_webhook_sync,
+                # which already honours 429 retry_after and must not replay POSTs blindly.
+                session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+                atexit.register(session.close)
+                _session = session
+    return _session
+
+# Background sender so scans don't wait on Discord round-trips; one worker keeps order
+_notify_queue = queue.Queue()
+_notify_thread = None
+
+def _notification_worker():
+    while True:
+        webhook_url, embed, config, event_type, success_message = _notify_queue.get()
+        try:
+            if send_discord_webhook_sync(webhook_url, embed, config, event_type=event_type) and success_message:
+                logger.info(success_message)
+        except Exception as e:
+            logger.error(f"Failed to send queued Discord notification: {e}")
+        finally:
+            _notify_queue.task_done()
+
+def queue_discord_webhook(webhook_url, embed, config, event_type=None, success_message=None):
+    """Send a webhook from the background notification thread and return immediately."""
+    global _notify_thread
+    if _notify_thread is None:
+        with _session_lock:
+            if _notify_thread is None:
+                thread = threading.Thread(target=_notification_worker, name="discord-notify", daemon=True)
+                thread.start()
+                atexit.register(flush_notifications)
+                _notify_thread = thread
+    _notify_queue.put((webhook_url, embed, config, event_type, success_message))
+
+def flush_notifications(timeout=30):
+    """Wait (up to timeout seconds) for queued notifications to be sent."""
+    deadline = time.monotonic() + timeout
+    with _notify_queue.all_tasks_done:
+        while _notify_queue.unfinished_tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"Gave up waiting for {_notify_queue.unfinished_tasks} queued Discord notification(s)")
+                return False
+            _notify_queue.all_tasks_done.wait(remaining)
+    return True
+
 def truncate_field_value(value, max_length=1024):
     """Truncate field value to Discord's limit of 1024 characters."""
-    if value is None:
-        return ""
-    value = str(value)
+    if type(value) is not str:
+        # Strings are the common case; only coerce anything else
+        if value is None:
+            return ""
+        value = str(value)
     if len(value) <= max_length:
         return value
     return value[:max_length-3] + "..."
 
-def format_file_list(files, max_items=10, prefix="• ", code_block=False, language=""):
-    """Format a list of files into a string with truncation."""
+def format_file_list(files, max_items=10, prefix="• ", code_block=False, language="", total=None):
+    """Format a list of files into a string with truncation.
+
+    ``total`` is the full count when ``files`` is only a sample of the items.
+    """
     if not files:
         return "None"
     
-    items = files[:max_items]
-    formatted = "\n".join([f"{prefix}{f}" for f in items])
+    formatted = "\n".join(prefix + f for f in files[:max_items])
     
-    if len(files) > max_items:
-        formatted += f"\n...and {len(files) - max_items} more"
+    if total is None:
+        total = len(files)
+    if total > max_items:
+        formatted += f"\n...and {total - max_items} more"
     
     if code_block:
-        # Truncate content BEFORE wrapping in code block to ensure it's closed correctly
-        # Discord's limit is 1024. Leave room for ```language\n and \n```
-        max_inner = 1000 - len(language)
+        # Truncate content BEFORE wrapping in code block to ensure it's closed correctly.
+        # Discord's field limit is 1024; the fences cost len("```" + language + "\n") + len("\n```").
+        max_inner = 1024 - 8 - len(language)
         formatted = truncate_field_value(formatted, max_inner)
-        return f"```{language}\n{formatted}\n```"
+        return "```" + language + "\n" + formatted + "\n```"
         
     return truncate_field_value(formatted, 1024)
 
+# Discord accepts at most 10 embeds per message, sharing one 6000-character budget
+DISCORD_MAX_EMBEDS = 10
+DISCORD_MAX_MESSAGE_LENGTH = 6000
+
 def get_embed_length(embed):
     """Calculate the total character count of an embed as Discord does."""
     length = len(embed.title or "") + len(embed.description or "")
@@ -48,8 +119,58 @@ def get_embed_length(embed):
         length += len(field.name) + len(field.value)
     return length
 
+def _embed_to_payload(embed):
+    """Clamp an embed to Discord's per-field and 6000-character limits and return its JSON dict."""
+    # Ensure individual field limits are respected before sending
+    if embed.title:
+        embed.title = truncate_field_value(embed.title, 256)
+    if embed.description:
+        embed.description = truncate_field_value(embed.description, 4096)
+
+    if embed.footer and embed.footer.text:
+        embed.set_footer(text=truncate_field_value(embed.footer.text, 2048))
+
+    if embed.author and embed.author.name:
+        embed.set_author(name=truncate_field_value(embed.author.name, 256))
+
+    # Measure the embed in the same pass that truncates its fields (as get_embed_length counts it)
+    total_length = len(embed.title or "") + len(embed.description or "")
+    if embed.author:
+        total_length += len(embed.author.name or "")
+    if embed.footer:
+        total_length += len(embed.footer.text or "")
+    for i, field in enumerate(embed.fields):
+        name = truncate_field_value(field.name, 256)
+        value = truncate_field_value(field.value, 1024)
+        embed.set_field_at(i, name=name, value=value, inline=field.inline)
+        total_length += len(name) + len(value)
+
+    # Check if total embed length exceeds Discord's character limit (6000)
+    if total_length > 6000:
+        # Fallback: keep the leading fields that fit, tracked with a running count
+        data = embed.to_dict()
+        note = "Note: Some details were truncated due to Discord length limits."
+        budget = 6000 - len(embed.title or "") - len(embed.description or "") - len(note)
+        if embed.author:
+            budget -= len(embed.author.name or "")
+        kept = []
+        for field in data.get("fields", []):
+            size = len(field["name"]) + len(field["value"])
+            if size > budget:
+                break
+            kept.append(field)
+            budget -= size
+        data["fields"] = kept
+        data["footer"] = {"text": note}
+        return data
+    return embed.to_dict()
+
 def send_discord_webhook_sync(webhook_url, embed, config, max_retries=3, event_type=None):
-    """Send a Discord webhook message synchronously using requests.
+    """Send a single embed as a Discord webhook message; see send_discord_embeds_sync."""
+    return send_discord_embeds_sync(webhook_url, [embed], config, max_retries=max_retries, event_type=event_type)
+
+def send_discord_embeds_sync(webhook_url, embeds, config, max_retries=3, event_type=None):
+    """Send up to DISCORD_MAX_EMBEDS embeds as one Discord webhook message synchronously.
     
     Handles Discord rate limiting (429) by respecting the retry_after value
     returned in the response body, with up to max_retries attempts.
@@ -116,49 +237,11 @@ def send_discord_webhook_sync(webhook_url, embed, config, max_retries=3, event_t
                     "roles": allowed_roles
                 }
 
-        # Ensure individual field limits are respected before sending
-        if embed.title:
-            embed.title = truncate_field_value(embed.title, 256)
-        if embed.description:
-            embed.description = truncate_field_value(embed.description, 4096)
-        
-        if embed.footer and embed.footer.text:
-            embed.set_footer(text=truncate_field_value(embed.footer.text, 2048))
-            
-        if embed.author and embed.author.name:
-            embed.set_author(name=truncate_field_value(embed.author.name, 256))
-
-        for i, field in enumerate(embed.fields):
-            embed.set_field_at(
-                i, 
-                name=truncate_field_value(field.name, 256), 
-                value=truncate_field_value(field.value, 1024), 
-                inline=field.inline
-            )
-
-        # Check if total embed length exceeds Discord's character limit (6000)
-        if get_embed_length(embed) > 6000:
-            # Simple fallback: just send the base info
-            base_embed = Embed(
-                title=embed.title,
-                description=embed.description,
-                color=embed.color,
-                timestamp=embed.timestamp
-            )
-            if embed.fields:
-                # Add only the first field (usually overview)
-                base_embed.add_field(name=embed.fields[0].name, value=embed.fields[0].value, inline=False)
-            
-            payload["embeds"].append(base_embed.to_dict())
-            
-            # Add a note about truncation
-            payload["embeds"][0]["footer"] = {"text": "Note: Some details were truncated due to Discord length limits."}
-        else:
-            payload["embeds"].append(embed.to_dict())
+        payload["embeds"] = [_embed_to_payload(embed) for embed in embeds]
 
         for attempt in range(1, max_retries + 1):
             try:
-                response = requests.post(webhook_url, json=payload, timeout=10)
+                response = get_session().post(webhook_url, json=payload, timeout=10)
 
                 if response.status_code == 429:
                     # Discord rate limit — parse retry_after from the response body
@@ -178,7 +261,7 @@ def send_discord_webhook_sync(webhook_url, embed, config, max_retries=3, event_t
                     else:
                         logger.error(
                             f"Discord webhook rate limited (429) after {max_retries} attempts. "
-                            f"Giving up on: {embed.title}"
+                            f"Giving up on: {embeds[0].title}"
                         )
                         return False
 
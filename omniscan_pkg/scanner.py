@@ -1,23 +1,34 @@
 import os
 import time
+import json
+import functools
+import heapq
+import itertools
 import logging
-import fnmatch
 import threading
 import gc
 import queue
+import struct
+import subprocess
+import concurrent.futures
 from urllib.parse import quote
 from concurrent.futures import ThreadPoolExecutor
-from collections import defaultdict
+from collections import OrderedDict, defaultdict, deque
 import requests
+from requests.adapters import HTTPAdapter
 from plexapi.server import PlexServer
 from datetime import datetime, timedelta
-from .notifications import send_discord_webhook_sync, format_file_list
+from .notifications import (
+    DISCORD_MAX_EMBEDS, DISCORD_MAX_MESSAGE_LENGTH, format_file_list, get_embed_length,
+    send_discord_embeds_sync,
+)
 from discord import Embed, Color
 from .metrics import (
     SCANNED_FILES_TOTAL, MISSING_FILES_TOTAL, TRIGGERED_SCANS_TOTAL, 
     SCAN_ERRORS_TOTAL, WATCHED_DIRECTORIES, PENDING_SCANS
 )
-from .models import StuckFileTracker
+from .models import RunStats, StuckFileTracker
+from .config import compile_ignore_patterns
 
 try:
     import websocket
@@ -33,12 +44,129 @@ logger = logging.getLogger(__name__)
 
 import re
 
+# Per-event paths are normalized several times over (library lookup, entity root,
+# cache membership, debounce bookkeeping); memoize them. Bulk walks (cache fills,
+# disk sweeps) keep calling os.path.normpath directly so they don't churn the cache.
+_normpath = functools.lru_cache(maxsize=8192)(os.path.normpath)
+
+# While a library cache warms up, is_in_library asks the server directly; a copy burst
+# asks about the same file many times, so answers are reused for a few seconds.
+_API_PRESENCE_TTL = 5.0
+_API_PRESENCE_MAX = 4096
+
+# ffprobe verdicts for unchanged files, keyed by (path, size, mtime_ns), so files that stay
+# missing from the library across scans aren't re-probed every run.
+_FFPROBE_CACHE_SIZE = 50000
+
+# NAS/OS housekeeping folders that never hold library media (thumbnails, recycle bins);
+# hidden (dot) folders are already skipped by name.
+_SKIP_DIR_NAMES = frozenset({'@eaDir', '#recycle', '#snapshot', '$RECYCLE.BIN', 'System Volume Information', 'lost+found'})
+
+# Folder names that only make sense next to their parent ("Show - Season 1")
+_SEASONLIKE_RE = re.compile(r'season |(?:specials|extras)\Z', re.IGNORECASE)
+
+# While the Plex alert websocket is up, completion arrives as an alert; /activities is
+# only re-checked this often as a safety net for missed alerts.
+_PLEX_SCAN_VERIFY_INTERVAL = 30.0
+
+# Containers whose layout can be checked for completeness without ffprobe (QUICK_INTEGRITY_CHECK)
+_MP4_EXTENSIONS = ('.mp4', '.m4v', '.mov')
+_MKV_EXTENSIONS = ('.mkv', '.webm')
+
+# A deleted file is checked again after this long to filter out renames and network hiccups
+_DELETION_RECHECK_DELAY = 2.0
+
+class _TokenBucket:
+    """Thread-safe pacing: acquire() returns at once while tokens remain, otherwise sleeps off its share."""
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # Tokens may go negative: each caller reserves its slot and sleeps outside the lock
+            self._tokens -= 1
+            wait = -self._tokens / self.rate
+        if wait > 0:
+            time.sleep(wait)
+
+def _read_ebml_vint(data, pos):
+    """Decode an EBML variable-length integer at data[pos]; returns (value, next_pos, all_ones) or None."""
+    if pos >= len(data) or data[pos] == 0:
+        return None
+    length = 8 - data[pos].bit_length() + 1
+    if pos + length > len(data):
+        return None
+    value = data[pos] & (0xFF >> length)
+    for b in data[pos + 1:pos + length]:
+        value = (value << 8) | b
+    return value, pos + length, value == (1 << (7 * length)) - 1
+
+
+def _container_complete(file_path, size):
+    """True if an MP4/MKV file's top-level structure accounts for exactly its size, else None.
+
+    A file cut short by an interrupted copy has atoms (or a Segment) running past EOF. This
+    reads a few headers rather than decoding streams, so None means "ask ffprobe".
+    """
+    name = file_path.lower()
+    try:
+        with open(file_path, 'rb') as f:
+            if name.endswith(_MP4_EXTENSIONS):
+                offset, seen_moov = 0, False
+                for _ in range(64):
+                    if offset == size:
+                        return True if seen_moov else None
+                    f.seek(offset)
+                    header = f.read(16)
+                    if len(header) < 8:
+                        return None
+                    atom_size, atom_type = struct.unpack('>I4s', header[:8])
+                    if offset == 0 and atom_type != b'ftyp':
+                        return None
+                    if atom_size == 1:
+                        if len(header) < 16:
+                            return None
+                        atom_size = struct.unpack('>Q', header[8:])[0]
+                    elif atom_size == 0:
+                        atom_size = size - offset
+                    if atom_size < 8 or offset + atom_size > size:
+                        return None
+                    seen_moov = seen_moov or atom_type == b'moov'
+                    offset += atom_size
+                return None
+            if name.endswith(_MKV_EXTENSIONS):
+                data = f.read(4096)
+                if data[:4] != b'\x1a\x45\xdf\xa3':
+                    return None
+                header = _read_ebml_vint(data, 4)
+                if header is None:
+                    return None
+                pos = header[1] + header[0]
+                if data[pos:pos + 4] != b'\x18\x53\x80\x67':
+                    return None
+                segment = _read_ebml_vint(data, pos + 4)
+                if segment is None or segment[2]:
+                    return None  # unknown-size (live) segment
+                return True if segment[1] + segment[0] == size else None
+    except OSError:
+        return None
+    return None
+
+
 class PlexScanner:
     def __init__(self, config):
         self.config = config
         self.plex = None
         self.plex_listener = None
-        self.active_scan_events = {}
+        self.active_scan_events = {}  # section id -> set of Events, one per scan being monitored
+        self.active_scan_lock = threading.Lock()
         self.jellyfin_listener_thread = None
         self.jellyfin_ws_stop = threading.Event()
         self.active_jellyfin_scan_events = {}
@@ -49,22 +177,15 @@ class PlexScanner:
             if self.config.get('SERVER_URL') and self.config.get('API_KEY'):
                 self._start_jellyfin_alert_listener()
         
-        # Compile ignore patterns for performance
-        self.ignore_regex = None
-        if config.get('IGNORE_PATTERNS'):
-            # Convert glob patterns to regex
-            # fnmatch.translate converts glob to regex, we join them with OR
-            try:
-                patterns = [fnmatch.translate(p) for p in config['IGNORE_PATTERNS'] if p.strip()]
-                if patterns:
-                    self.ignore_regex = re.compile('|'.join(patterns))
-            except Exception as e:
-                logger.error(f"Failed to compile ignore patterns: {e}")
+        # Ignore patterns are compiled once by load_config; fall back for hand-built configs
+        if 'IGNORE_RE' not in self.config:
+            self.config['IGNORE_RE'] = compile_ignore_patterns(self.config.get('IGNORE_PATTERNS', []))
 
         self.history = StuckFileTracker()
         self.library_ids = {}
         self.library_paths = {}
         self.library_sections_cache = []
+        self._location_index = (None, [], {}, ()) # (cache key, [(norm_loc, norm_loc + sep, id, title, type)], {norm_loc: entry})
         self.library_files = {} # Changed to dict for easier clearing
         self.library_counts = {} # Store last known counts when cache is invalidated
         self.library_rating_keys = {} # Store mapping of file paths to rating keys
@@ -75,8 +196,14 @@ class PlexScanner:
         self.library_files_lock = threading.Lock()
         self.loading_libraries = set()
         self.loading_lock = threading.Lock()
+        self._api_presence_cache = {}  # norm_path -> (expires_at, present)
         self.pending_scans = {}
         self.pending_scans_lock = threading.Lock()
+        # Debounce schedule: (last_event_time, seq, key) min-heap. Superseded entries
+        # are left in place and skipped when popped; the event wakes the worker.
+        self._scan_heap = []
+        self._scan_seq = itertools.count()
+        self._scan_wakeup = threading.Event()
         self.pending_notifications = defaultdict(lambda: {'added': [], 'deleted': [], 'library_title': ''})
         # Buffer for grouping ready notifications before flushing to Discord
         self.notify_buffer = []          # list of (path, data) waiting to be sent
@@ -91,7 +218,6 @@ class PlexScanner:
         self._activities_lock = threading.Lock()
         
         # Persistent session for connection pooling
-        from requests.adapters import HTTPAdapter
         self.http_session = requests.Session()
         adapter = HTTPAdapter(pool_connections=100, pool_maxsize=100)
         self.http_session.mount('http://', adapter)
@@ -103,6 +229,12 @@ class PlexScanner:
         # Executor for processing file events asynchronously
         self.event_executor = ThreadPoolExecutor(max_workers=config.get('SCAN_WORKERS', 4))
         
+        # Executor for ffprobe integrity checks; the work is waiting on child processes
+        self.integrity_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix='ffprobe')
+        self._ffprobe_cache = OrderedDict()
+        self._scan_pacer = None  # ((SCAN_DELAY, SCAN_WORKERS), _TokenBucket)
+        self._ffprobe_cache_lock = threading.Lock()
+        
         # Executor for monitoring Plex scans without blocking the queue
         self.scan_monitor_executor = ThreadPoolExecutor(max_workers=4)
 
@@ -115,25 +247,65 @@ class PlexScanner:
         self.notification_worker_thread = threading.Thread(target=self._notification_worker, daemon=True)
         self.notification_worker_thread.start()
 
-    def _notification_worker(self):
-        """Sequential worker for sending Discord notifications to avoid rate limits."""
+        # Deletions waiting for their re-check; the delay is fixed, so the deque stays in due order
+        self._deletion_rechecks = deque()
+        self._deletion_recheck_wakeup = threading.Event()
+        self.deletion_recheck_thread = threading.Thread(target=self._deletion_recheck_worker, daemon=True)
+        self.deletion_recheck_thread.start()
+
+    def _deletion_recheck_worker(self):
+        """Hand deletions back to the event executor once their re-check delay has passed."""
         while True:
             try:
-                queue_item = self.notification_queue.get()
-                if isinstance(queue_item, tuple):
-                    embed, event_type = queue_item
-                else:
-                    embed = queue_item
-                    event_type = None
-                
-                if send_discord_webhook_sync(self.config['DISCORD_WEBHOOK_URL'], embed, self.config, event_type=event_type):
-                    logger.info(f"✅ Discord notification sent: {embed.title}")
+                if not self._deletion_rechecks:
+                    self._deletion_recheck_wakeup.wait()
+                    self._deletion_recheck_wakeup.clear()
+                    continue
+                due, file_path = self._deletion_rechecks[0]
+                delay = due - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                self._deletion_rechecks.popleft()
+                self.event_executor.submit(self.handle_deletion, file_path, recheck=True)
+            except Exception as e:
+                logger.error(f"Error in deletion re-check worker: {e}")
+                time.sleep(1)
+
+    def _notification_worker(self, flush_interval=1.0):
+        """Sequential worker that coalesces queued embeds into batched Discord messages."""
+        carry = None
+        while True:
+            try:
+                batch = [carry or self.notification_queue.get()]
+                carry = None
+                event_type = batch[0][1]
+                budget = DISCORD_MAX_MESSAGE_LENGTH - min(get_embed_length(batch[0][0]), DISCORD_MAX_MESSAGE_LENGTH)
+                # Give a burst a moment to arrive, then pack what fits into one message
+                deadline = time.time() + flush_interval
+                while len(batch) < DISCORD_MAX_EMBEDS:
+                    try:
+                        item = self.notification_queue.get(timeout=max(0, deadline - time.time()))
+                    except queue.Empty:
+                        break
+                    size = get_embed_length(item[0])
+                    if item[1] != event_type or size > budget:
+                        # Mentions are per message and the length budget is shared; send it next
+                        carry = item
+                        break
+                    batch.append(item)
+                    budget -= size
+
+                embeds = [embed for embed, _ in batch]
+                titles = ", ".join(str(embed.title) for embed in embeds)
+                if send_discord_embeds_sync(self.config['DISCORD_WEBHOOK_URL'], embeds, self.config, event_type=event_type):
+                    logger.info(f"✅ Discord notification sent: {titles}")
                 else:
-                    logger.error(f"❌ Failed to send Discord notification: {embed.title}")
+                    logger.error(f"❌ Failed to send Discord notification: {titles}")
                 
                 # Respect Discord's global rate limit: 30 messages per 60s = 1 per 2s minimum
                 time.sleep(2)
-                self.notification_queue.task_done()
+                for _ in batch:
+                    self.notification_queue.task_done()
             except Exception as e:
                 logger.error(f"Error in notification worker: {e}")
                 time.sleep(5)
@@ -206,9 +378,11 @@ class PlexScanner:
                 
                 if activity_type == 'library.refresh.section':
                     if state != 'running':
-                        event = self.active_scan_events.get(section_id)
-                        if event:
+                        with self.active_scan_lock:
+                            events = list(self.active_scan_events.get(section_id, ()))
+                        if events:
                             logger.debug(f"🔔 WebSocket scan completion signal received for Plex library section: {section_id}")
+                        for event in events:
                             event.set()
         except Exception as e:
             logger.debug(f"Error handling Plex Alert: {e}")
@@ -239,7 +413,6 @@ class PlexScanner:
             ws_url = ws_url.rstrip('/')
             
             # Jellyfin/Emby WS endpoint
-            import json
             ws_endpoint = f"{ws_url}/socket?api_key={self.config['API_KEY']}&deviceId=omniscan"
             
             logger.info(f"📡 Connecting to Jellyfin/Emby WebSocket: {ws_url}/socket")
@@ -292,18 +465,50 @@ class PlexScanner:
 
     def is_ignored(self, file_path):
         """Check if file matches any ignore pattern using compiled regex."""
-        if not self.ignore_regex:
+        ignore_re = self.config.get('IGNORE_RE')
+        if not ignore_re:
             return False
         
         # Check both filename and full path to match standard behavior
         # (Usually full path match is what users want for folders like /RecycleBin)
-        if self.ignore_regex.match(file_path):
+        if ignore_re.match(file_path):
             return True
-        if self.ignore_regex.match(os.path.basename(file_path)):
+        if ignore_re.match(os.path.basename(file_path)):
             return True
             
         return False
 
+    def _walk_file_entries(self, top):
+        """os.walk() that yields (dir_path, file DirEntries), skipping prunable directories.
+
+        Like os.walk, symlinked directories are listed but not descended into.
+        """
+        pending = [top]
+        while pending:
+            current = pending.pop()
+            files = []
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        if not is_dir:
+                            files.append(entry)
+                        elif not entry.is_symlink() and not self._is_prunable_dir(entry):
+                            pending.append(entry.path)
+            except OSError:
+                continue
+            yield current, files
+
+    def _is_prunable_dir(self, entry):
+        """Cheap name and ignore-pattern checks on a directory DirEntry, before any library lookup."""
+        if entry.name in _SKIP_DIR_NAMES:
+            return True
+        ignore_re = self.config.get('IGNORE_RE')
+        return bool(ignore_re and (ignore_re.match(entry.path) or ignore_re.match(entry.name)))
+
     def get_library_ids(self):
         """Fetch library section IDs and paths dynamically from Plex or Jellyfin/Emby."""
         self.library_sections_cache = []
@@ -379,9 +584,55 @@ class PlexScanner:
         except Exception as e:
             logger.error(f"Failed to fetch {self.config['SERVER_TYPE']} libraries: {e}")
 
+    def _get_location_index(self):
+        """Normalized library locations, longest first, rebuilt only when the section cache changes."""
+        sections = self.library_sections_cache
+        # Keep the list itself in the key: comparing by id() alone could match a new list
+        # allocated at the address of the one get_library_ids just replaced.
+        key = self._location_index[0]
+        if key is None or key[0] is not sections or key[1] != len(sections):
+            key = (sections, len(sections))
+            index = []
+            for section in sections:
+                for location_path in section['locations']:
+                    norm_loc = os.path.normpath(location_path)
+                    index.append((norm_loc, norm_loc + os.sep, section['id'], section['title'], section['type']))
+            index.sort(key=lambda entry: len(entry[0]), reverse=True)
+            by_location = {}
+            for entry in index:
+                by_location.setdefault(entry[0], entry)
+            self._location_index = (key, index, by_location, tuple(by_location))
+            # Memoized path -> library answers were computed against the old locations
+            with self.path_library_cache_lock:
+                self.path_library_cache.clear()
+        return self._location_index[1]
+
+    def _match_location(self, norm_path):
+        """Return (norm_location, id, title, type) of the most specific library containing norm_path."""
+        self._get_location_index()
+        _, _, by_location, prefixes = self._location_index
+        # Paths outside every library (downloads, temp dirs) fail one C-level startswith
+        # instead of walking all their ancestors.
+        if not norm_path.startswith(prefixes):
+            return None
+        # Walk up the path's ancestors, deepest first: the first one that is a library
+        # location is the most specific match. O(path depth) dict lookups, whatever the
+        # number of configured locations.
+        candidate = norm_path
+        while candidate:
+            entry = by_location.get(candidate)
+            if entry is not None:
+                return entry[0], entry[2], entry[3], entry[4]
+            parent = os.path.dirname(candidate)
+            if parent == candidate:
+                break
+            candidate = parent
+        return None
+
     def get_library_id_for_path(self, file_path):
         """Get the library section ID and type for a given file path from cache."""
-        norm_file_path = os.path.normpath(file_path)
+        norm_file_path = _normpath(file_path)
+        self._get_location_index()  # drops path_library_cache if the sections changed
         
         # Lock-free fast path check (safe for concurrent reads under GIL/thread-safety)
         res = self.path_library_cache.get(norm_file_path)
@@ -406,37 +657,26 @@ class PlexScanner:
                 self.path_library_cache[norm_file_path] = res
                 return res
         
-        best_match = None
-        best_match_length = -1
-        norm_file_path_sep = norm_file_path + os.sep
-        
-        for section in self.library_sections_cache:
-            section_id = section['id']
-            section_title = section['title']
-            section_type = section['type']
-            
-            for location_path in section['locations']:
-                norm_loc = os.path.normpath(location_path)
-                
-                if norm_file_path == norm_loc or norm_file_path_sep.startswith(norm_loc + os.sep):
-                    loc_len = len(norm_loc)
-                    if loc_len > best_match_length:
-                        best_match = (section_id, section_title, section_type)
-                        best_match_length = loc_len
-        
-        res = best_match if best_match else (None, None, None)
+        match = self._match_location(norm_file_path)
+        res = match[1:] if match else (None, None, None)
+
         with self.path_library_cache_lock:
             self.path_library_cache[norm_file_path] = res
             self.path_library_cache[parent_dir] = res
             
         return res
 
-    def cache_library_files(self, library_id):
-        """Cache all files in a library section using paginated fetching to save memory."""
+    def cache_library_files(self, library_id, refresh=False):
+        """Cache all files in a library section using paginated fetching to save memory.
+
+        With refresh=True an existing cache is rebuilt; readers keep using the old one until
+        the new one replaces it.
+        """
         library_id = str(library_id)
-        with self.library_files_lock:
-            if library_id in self.library_files and self.library_files[library_id]:
-                return
+        if not refresh:
+            with self.library_files_lock:
+                if library_id in self.library_files and self.library_files[library_id]:
+                    return
         
         server_type = self.config.get('SERVER_TYPE', 'plex')
         if server_type in ['jellyfin', 'emby']:
@@ -470,13 +710,14 @@ class PlexScanner:
                 b_files = {}
                 b_keys = {}
                 b_count = 0
+                normpath = os.path.normpath  # hoisted: runs once per media part
                 for item in items:
                     rating_key = item.get('ratingKey')
-                    for media in item.get('Media', []):
-                        for part in media.get('Part', []):
+                    for media in item.get('Media', ()):
+                        for part in media.get('Part', ()):
                             file_path = part.get('file')
                             if file_path:
-                                norm_p = os.path.normpath(file_path)
+                                norm_p = normpath(file_path)
                                 b_files[norm_p] = part.get('size', 0)
                                 if rating_key:
                                     b_keys[norm_p] = rating_key
@@ -518,9 +759,23 @@ class PlexScanner:
             if isinstance(e, requests.RequestException):
                 self.plex = None
 
+    def _cache_all_libraries(self, refresh=False):
+        """cache_library_files for every known section, with the sections' fetches overlapping."""
+        section_ids = [section['id'] for section in self.library_sections_cache or ()]
+        if len(section_ids) < 2:
+            for section_id in section_ids:
+                self.cache_library_files(section_id, refresh)
+            return
+        with ThreadPoolExecutor(max_workers=min(8, len(section_ids)), thread_name_prefix='library-cache') as executor:
+            list(executor.map(self.cache_library_files, section_ids, itertools.repeat(refresh)))
+
     def _trigger_cache_fill(self, library_id):
         # Optimization: Only fill if notifications or stats need it, 
         # but actually we almost always need it for is_in_library.
+        if library_id in self.loading_libraries:
+            # Unlocked fast path for the event burst that arrives while a fill is running;
+            # the locked check below still settles races between first callers.
+            return
         with self.loading_lock:
             if library_id in self.loading_libraries:
                 return
@@ -558,96 +813,112 @@ class PlexScanner:
             existing_missing = self.library_missing_files.get(library_id, set())
         
         missing_files = set()
-        lib_exts = self.config.get('LIBRARY_EXTENSIONS', set())
+        lib_exts = tuple(self.config.get('LIBRARY_EXTENSIONS', ()))
         
         cutoff_time = 0
         is_incremental = self.config.get('INCREMENTAL_SCAN')
         if is_incremental:
             cutoff_time = time.time() - (self.config['SCAN_SINCE_DAYS'] * 86400)
         
+        symlink_check = self.config.get('SYMLINK_CHECK')
         for loc in section.get('locations', []):
             if not os.path.exists(loc):
                 continue
-            for root, _, files in os.walk(loc):
+            # Walking from the normalized root keeps every DirEntry.path normalized as well
+            for root, files in self._walk_file_entries(os.path.normpath(loc)):
                 if is_incremental:
                     try:
                         mtime = os.path.getmtime(root)
                         if mtime < cutoff_time:
-                            norm_root = os.path.normpath(root)
                             for path in existing_missing:
-                                if os.path.dirname(path) == norm_root:
-                                    if self.config.get('SYMLINK_CHECK') and self.is_broken_symlink(path):
+                                if os.path.dirname(path) == root:
+                                    if symlink_check and self.is_broken_symlink(path):
                                         continue
                                     if path not in cached_files:
                                         missing_files.add(path)
                             continue
                     except OSError:
                         pass
-                for f in files:
-                    ext = os.path.splitext(f)[1].lower()
-                    if ext in lib_exts:
-                        full_path = os.path.join(root, f)
-                        norm_path = os.path.normpath(full_path)
-                        if self.config.get('SYMLINK_CHECK') and self.is_broken_symlink(norm_path):
+                for entry in files:
+                    if entry.name.lower().endswith(lib_exts):
+                        if symlink_check and entry.is_symlink() and not entry.is_file():
                             continue
-                        if norm_path not in cached_files:
-                            missing_files.add(norm_path)
+                        if entry.path not in cached_files:
+                            missing_files.add(entry.path)
                             
         with self.library_files_lock:
             self.library_missing_files[library_id] = missing_files
         return len(missing_files)
 
-    def is_in_library(self, file_path):
-        """Check if a file exists in the media server."""
-        server_type = self.config.get('SERVER_TYPE', 'plex')
-        
+    def is_in_library(self, file_path, library_id=None):
+        """Check if a file exists in the media server.
+
+        Callers that already resolved the file's library pass library_id to skip a second lookup.
+        """
         # Check cache if it exists
-        library_id, library_title, _ = self.get_library_id_for_path(file_path)
-        if library_id:
-            norm_path = os.path.normpath(file_path)
-            
-            # Lock-free fast path check (safe for concurrent reads under GIL)
-            files_collection = self.library_files.get(library_id)
-            if files_collection is not None:
-                if norm_path not in files_collection:
-                    return False
-                
-                # Check for in-place upgrades
-                if isinstance(files_collection, dict):
-                    cached_size = files_collection.get(norm_path)
-                    if cached_size is not None and cached_size > 0:
-                        try:
-                            current_size = os.path.getsize(file_path)
-                            if current_size > 0 and current_size != cached_size:
-                                logger.info(f"🔄 In-place upgrade detected: {BOLD}{file_path}{RESET} ({cached_size} -> {current_size} bytes)")
-                                return False
-                        except Exception:
-                            pass
-                            
-                return True
-            
-            # Ensure cache is loaded
-            with self.library_files_lock:
-                cache_filled = library_id in self.library_files
+        if library_id is None:
+            library_id = self.get_library_id_for_path(file_path)[0]
+        if not library_id:
+            # Outside every library location: the server cannot have it, skip cache and API
+            return False
+        norm_path = _normpath(file_path)
+        
+        # Lock-free fast path check (safe for concurrent reads under GIL)
+        files_collection = self.library_files.get(library_id)
+        if files_collection is not None:
+            if norm_path not in files_collection:
+                return False
             
-            if not cache_filled:
-                self._trigger_cache_fill(library_id)
-                # Fallback to direct API check while cache warms up
-                if server_type == 'plex':
-                    return self._is_in_plex_api(file_path, library_id)
-                elif server_type in ['jellyfin', 'emby']:
-                    return self._is_in_jellyfin_api(file_path, library_id)
+            # Check for in-place upgrades
+            if isinstance(files_collection, dict):
+                cached_size = files_collection.get(norm_path)
+                if cached_size is not None and cached_size > 0:
+                    try:
+                        current_size = os.path.getsize(file_path)
+                        if current_size > 0 and current_size != cached_size:
+                            logger.info(f"🔄 In-place upgrade detected: {BOLD}{file_path}{RESET} ({cached_size} -> {current_size} bytes)")
+                            return False
+                    except Exception:
+                        pass
+                        
+            return True
+        
+        # Ensure cache is loaded
+        with self.library_files_lock:
+            cache_filled = library_id in self.library_files
+        
+        if not cache_filled:
+            self._trigger_cache_fill(library_id)
+            # Fallback to direct API check while cache warms up
+            return self._is_in_library_api(file_path, library_id)
 
-            with self.library_files_lock:
-                if library_id in self.library_files and self.library_files[library_id] is not None:
-                    return norm_path in self.library_files[library_id]
+        with self.library_files_lock:
+            if library_id in self.library_files and self.library_files[library_id] is not None:
+                return norm_path in self.library_files[library_id]
+
+        # If the cache check failed, fallback to direct API check
+        return self._is_in_library_api(file_path, library_id)
 
-        # If cache check failed or library not found in cache, fallback to direct API check
+    def _is_in_library_api(self, file_path, library_id=None):
+        """Check the media server API directly, reusing answers younger than _API_PRESENCE_TTL."""
+        norm_path = _normpath(file_path)
+        now = time.time()
+        cached = self._api_presence_cache.get(norm_path)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        server_type = self.config.get('SERVER_TYPE', 'plex')
         if server_type == 'plex':
-            return self._is_in_plex_api(file_path, library_id)
+            present = self._is_in_plex_api(file_path, library_id)
         elif server_type in ['jellyfin', 'emby']:
-            return self._is_in_jellyfin_api(file_path, library_id)
-        return False
+            present = self._is_in_jellyfin_api(file_path, library_id)
+        else:
+            return False
+
+        if len(self._api_presence_cache) >= _API_PRESENCE_MAX:
+            self._api_presence_cache.clear()
+        self._api_presence_cache[norm_path] = (now + _API_PRESENCE_TTL, present)
+        return present
 
     def _is_in_plex_api(self, file_path, library_id=None):
         """Directly check Plex API for a file without using a large RAM cache."""
@@ -672,7 +943,7 @@ class PlexScanner:
             filename = os.path.basename(file_path)
             results = section.search(title=filename, libtype=libtype)
             
-            norm_target = os.path.normpath(file_path)
+            norm_target = _normpath(file_path)
             for item in results:
                 if hasattr(item, 'media'):
                     for media in item.media:
@@ -720,11 +991,12 @@ class PlexScanner:
             batch_size = 5000
             start_index = 0
             count = 0
+            normpath = os.path.normpath  # hoisted: runs once per item
+            headers = self._get_jellyfin_headers()
             
             while True:
                 # Fetch items in batches using StartIndex and Limit
                 url = f"{self.config['SERVER_URL']}/Items?ParentId={library_id}&Recursive=true&Fields=Path&IncludeItemTypes=Movie,Episode,Audio,MusicVideo,MusicAlbum&StartIndex={start_index}&Limit={batch_size}"
-                headers = self._get_jellyfin_headers()
                 res = self.http_session.get(url, headers=headers)
                 res.raise_for_status()
                 data = res.json()
@@ -737,7 +1009,7 @@ class PlexScanner:
                     path = item.get('Path')
                     item_id = item.get('Id')
                     if path:
-                        norm_p = os.path.normpath(path)
+                        norm_p = normpath(path)
                         new_files.add(norm_p)
                         if item_id:
                             new_rating_keys[norm_p] = item_id
@@ -747,10 +1019,9 @@ class PlexScanner:
                 total_count = data.get('TotalRecordCount', 0)
                 start_index += batch_count
                 
-                # Clear large objects to free memory
+                # Drop the batch now; refcounting frees it without a full gc pass per page
                 del data
                 del items
-                gc.collect()
 
                 if batch_count < batch_size or start_index >= total_count:
                     break
@@ -770,21 +1041,11 @@ class PlexScanner:
 
     def get_entity_root(self, file_path):
         """Get the root folder of the show or movie for batching scans."""
-        library_id, library_title, library_type = self.get_library_id_for_path(file_path)
-        if not library_id:
-            return os.path.dirname(file_path)
-            
-        # Find the matching library location
-        best_location = None
-        for section in self.library_sections_cache:
-            if str(section['id']) == str(library_id):
-                for location in section['locations']:
-                    if os.path.normpath(file_path).startswith(os.path.normpath(location)):
-                        if not best_location or len(location) > len(best_location):
-                            best_location = os.path.normpath(location)
-        
-        if not best_location:
+        # The location that decided the library is the root to measure from; no second scan
+        match = self._match_location(_normpath(file_path))
+        if not match:
             return os.path.dirname(file_path)
+        best_location = match[0]
             
         rel_path = os.path.relpath(file_path, best_location)
         parts = [p for p in rel_path.split(os.sep) if p and p != '.']
@@ -797,12 +1058,10 @@ class PlexScanner:
 
     def is_library_root(self, library_id, folder_path):
         """Check if the given folder path is a root location for the library."""
-        for section in self.library_sections_cache:
-            if str(section['id']) == str(library_id):
-                for location in section['locations']:
-                    if os.path.normpath(folder_path) == os.path.normpath(location):
-                        return True
-        return False
+        norm_folder = _normpath(folder_path)
+        library_id = str(library_id)
+        return any(norm_loc == norm_folder and str(section_id) == library_id
+                   for norm_loc, _, section_id, _, _ in self._get_location_index())
 
     def is_entity_root(self, folder_path):
         """Check if the given folder is a top-level entity (Show or Movie folder) in its library."""
@@ -811,11 +1070,11 @@ class PlexScanner:
             return False
             
         entity_root = self.get_entity_root(folder_path)
-        return os.path.normpath(folder_path) == os.path.normpath(entity_root)
+        return _normpath(folder_path) == _normpath(entity_root)
 
     def should_scan_directory(self, dir_path):
         """Check if a directory or any of its subdirectories belong to a library."""
-        normalized_dir = os.path.normpath(dir_path)
+        normalized_dir = _normpath(dir_path)
         
         # 1. Is the directory itself in a library (or a subdirectory of one)?
         lib_id, _, _ = self.get_library_id_for_path(normalized_dir)
@@ -823,18 +1082,16 @@ class PlexScanner:
             return True
             
         # 2. Is any library location a subdirectory of this directory?
-        for section in self.library_sections_cache:
-            for location in section['locations']:
-                normalized_location = os.path.normpath(location)
-                if normalized_location.startswith(normalized_dir + os.sep):
-                    return True
-                    
-        return False
+        normalized_dir_sep = normalized_dir + os.sep
+        return any(norm_loc.startswith(normalized_dir_sep) for norm_loc, _, _, _, _ in self._get_location_index())
 
     def trigger_scan(self, library_id, folder_path, force=False, metadata=None):
         """Enqueue a library scan for a specific folder."""
+        if self.is_ignored(folder_path):
+            return
         if force:
             self._do_trigger_scan(library_id, folder_path)
+            self._scan_wakeup.set()
             return
 
         # Start with the new metadata
@@ -843,70 +1100,90 @@ class PlexScanner:
             merged_metadata.update(metadata)
 
         with self.pending_scans_lock:
-            # Check for parent/child redundancies
-            keys_to_remove = []
-            for (pid, ppath, extra_val) in list(self.pending_scans.keys()):
-                if pid == library_id:
-                    # Case 1: A parent/ancestor of the new folder is already pending scan.
-                    if folder_path.startswith(ppath + os.sep) or ppath == folder_path:
-                        logger.debug(f"⏳ Updating debounce for pending scan {ppath} due to activity in {folder_path}")
-                        # Update the parent's debounce timer so we wait for the LATEST file
-                        old_time, old_metadata = self.pending_scans[(pid, ppath, extra_val)]
-                        
-                        # Merge metadata
-                        final_metadata = {}
-                        if old_metadata:
-                            final_metadata.update(old_metadata)
-                        final_metadata.update(merged_metadata)
-                        
-                        # Preserve 'deleted' event type if either was deleted
-                        if (old_metadata and old_metadata.get('event_type') == 'deleted') or \
-                           (merged_metadata.get('event_type') == 'deleted'):
-                            final_metadata['event_type'] = 'deleted'
-                            
-                        self.pending_scans[(pid, ppath, extra_val)] = (time.time(), final_metadata)
-                        return
-
-                    # Case 2: The new folder is a parent/ancestor of an already pending scan.
-                    if ppath.startswith(folder_path + os.sep):
-                        logger.debug(f"⏳ Removing specific pending scan {ppath} in favor of broad parent scan {folder_path}")
-                        old_time, old_metadata = self.pending_scans[(pid, ppath, extra_val)]
-                        # Carry over 'deleted' event type if the sub-folder scan was a deletion
-                        if old_metadata and old_metadata.get('event_type') == 'deleted':
-                            merged_metadata['event_type'] = 'deleted'
-                        keys_to_remove.append((pid, ppath, extra_val))
-
-            for k in keys_to_remove:
-                del self.pending_scans[k]
-
-            is_new = (library_id, folder_path, None) not in self.pending_scans
-            
-            # If there's already a pending scan for this exact path, we merge
-            if not is_new:
-                old_time, old_metadata = self.pending_scans[(library_id, folder_path, None)]
-                final_metadata = {}
-                if old_metadata:
-                    final_metadata.update(old_metadata)
-                final_metadata.update(merged_metadata)
-                if (old_metadata and old_metadata.get('event_type') == 'deleted') or \
-                   (merged_metadata.get('event_type') == 'deleted'):
-                    final_metadata['event_type'] = 'deleted'
-                self.pending_scans[(library_id, folder_path, None)] = (time.time(), final_metadata)
-            else:
-                self.pending_scans[(library_id, folder_path, None)] = (time.time(), merged_metadata)
-                
-            if merged_metadata and folder_path in self.pending_notifications:
-                self.pending_notifications[folder_path]['metadata'] = merged_metadata
-            if is_new:
-                logger.info(f"⏳ Scan queued (debouncing): {BOLD}{folder_path}{RESET}")
+            self._queue_scan_locked(library_id, folder_path, merged_metadata)
+
+    def _queue_scan_locked(self, library_id, folder_path, merged_metadata):
+        """Debounce-queue a scan, folding it into pending parent/child scans. Caller holds pending_scans_lock."""
+        # Check for parent/child redundancies
+        keys_to_remove = []
+        for (pid, ppath, extra_val) in list(self.pending_scans.keys()):
+            if pid == library_id:
+                # Case 1: A parent/ancestor of the new folder is already pending scan.
+                if folder_path.startswith(ppath + os.sep) or ppath == folder_path:
+                    logger.debug(f"⏳ Updating debounce for pending scan {ppath} due to activity in {folder_path}")
+                    # Update the parent's debounce timer so we wait for the LATEST file
+                    old_time, old_metadata = self.pending_scans[(pid, ppath, extra_val)]
+
+                    # Merge metadata
+                    final_metadata = {}
+                    if old_metadata:
+                        final_metadata.update(old_metadata)
+                    final_metadata.update(merged_metadata)
+
+                    # Preserve 'deleted' event type if either was deleted
+                    if (old_metadata and old_metadata.get('event_type') == 'deleted') or \
+                       (merged_metadata.get('event_type') == 'deleted'):
+                        final_metadata['event_type'] = 'deleted'
+
+                    self._touch_pending_scan((pid, ppath, extra_val), final_metadata)
+                    return
+
+                # Case 2: The new folder is a parent/ancestor of an already pending scan.
+                if ppath.startswith(folder_path + os.sep):
+                    logger.debug(f"⏳ Removing specific pending scan {ppath} in favor of broad parent scan {folder_path}")
+                    old_time, old_metadata = self.pending_scans[(pid, ppath, extra_val)]
+                    # Carry over 'deleted' event type if the sub-folder scan was a deletion
+                    if old_metadata and old_metadata.get('event_type') == 'deleted':
+                        merged_metadata['event_type'] = 'deleted'
+                    keys_to_remove.append((pid, ppath, extra_val))
+
+        for k in keys_to_remove:
+            del self.pending_scans[k]
+
+        is_new = (library_id, folder_path, None) not in self.pending_scans
+
+        # If there's already a pending scan for this exact path, we merge
+        if not is_new:
+            old_time, old_metadata = self.pending_scans[(library_id, folder_path, None)]
+            final_metadata = {}
+            if old_metadata:
+                final_metadata.update(old_metadata)
+            final_metadata.update(merged_metadata)
+            if (old_metadata and old_metadata.get('event_type') == 'deleted') or \
+               (merged_metadata.get('event_type') == 'deleted'):
+                final_metadata['event_type'] = 'deleted'
+            self._touch_pending_scan((library_id, folder_path, None), final_metadata)
+        else:
+            self._touch_pending_scan((library_id, folder_path, None), merged_metadata)
+
+        if merged_metadata and folder_path in self.pending_notifications:
+            self.pending_notifications[folder_path]['metadata'] = merged_metadata
+        if is_new:
+            logger.info(f"⏳ Scan queued (debouncing): {BOLD}{folder_path}{RESET}")
+
+    def _touch_pending_scan(self, key, metadata):
+        """Record activity on a pending scan and schedule its debounce. Caller holds pending_scans_lock."""
+        now = time.time()
+        self.pending_scans[key] = (now, metadata)
+        heapq.heappush(self._scan_heap, (now, next(self._scan_seq), key))
+        self._scan_wakeup.set()
+
+    def _scan_queue_timeout(self, debounce_delay, max_wait=60):
+        """Seconds until the worker has something to do. Caller holds pending_scans_lock."""
+        now = time.time()
+        timeout = max_wait
+        if self._scan_heap:
+            timeout = min(timeout, self._scan_heap[0][0] + debounce_delay - now)
+        if self.notify_buffer_since is not None:
+            group_window = self.config.get('NOTIFICATION_GROUP_WINDOW', 15)
+            timeout = min(timeout, self.notify_buffer_since + group_window - now)
+        return timeout
 
     def _process_scan_queue(self):
         """Background worker to process debounced scans and notifications."""
         last_gc = time.time()
         while True:
             try:
-                time.sleep(1)
-                
                 # Periodic memory cleanup
                 if time.time() - last_gc > 300: # Every 5 minutes
                     gc.collect()
@@ -915,27 +1192,41 @@ class PlexScanner:
                 to_trigger = []
                 ready_notifications = []
                 
+                # Clear before reading the schedule so a push made after this point
+                # still cuts the wait short
+                self._scan_wakeup.clear()
+                debounce_delay = self.config.get('SCAN_DEBOUNCE', 10)
+                with self.pending_scans_lock:
+                    timeout = self._scan_queue_timeout(debounce_delay)
+                if timeout > 0:
+                    self._scan_wakeup.wait(timeout)
+
                 with self.pending_scans_lock:
                     PENDING_SCANS.set(len(self.pending_scans))
                     now = time.time()
-                    debounce_delay = self.config.get('SCAN_DEBOUNCE', 10)
                     
-                    # 1. Process Scans that are ready
-                    for key, (last_time, metadata) in list(self.pending_scans.items()):
-                        if now - last_time >= debounce_delay:
-                            library_id, folder_path, _ = key
-                            
-                            # Mass Deletion Protection for individual file deletions
-                            if self.config.get('ABORT_ON_MASS_DELETION'):
-                                threshold = self.config.get('DELETION_THRESHOLD', 50)
-                                del_count = len(self.pending_notifications.get(folder_path, {}).get('deleted', []))
-                                if del_count > threshold:
-                                    logger.error(f"🛑 ABORTING SCAN: {del_count} individual files deleted in '{folder_path}' (Threshold: {threshold}).")
-                                    del self.pending_scans[key]
-                                    continue
-                                    
-                            to_trigger.append((library_id, folder_path, metadata))
-                            del self.pending_scans[key]
+                    # 1. Process Scans whose debounce has expired
+                    heap = self._scan_heap
+                    while heap and heap[0][0] + debounce_delay <= now:
+                        last_time, _, key = heapq.heappop(heap)
+                        entry = self.pending_scans.get(key)
+                        if entry is None or entry[0] != last_time:
+                            # Dropped, or superseded by newer activity that has its own entry
+                            continue
+                        metadata = entry[1]
+                        library_id, folder_path, _ = key
+                        
+                        # Mass Deletion Protection for individual file deletions
+                        if self.config.get('ABORT_ON_MASS_DELETION'):
+                            threshold = self.config.get('DELETION_THRESHOLD', 50)
+                            del_count = len(self.pending_notifications.get(folder_path, {}).get('deleted', []))
+                            if del_count > threshold:
+                                logger.error(f"🛑 ABORTING SCAN: {del_count} individual files deleted in '{folder_path}' (Threshold: {threshold}).")
+                                del self.pending_scans[key]
+                                continue
+                                
+                        to_trigger.append((library_id, folder_path, metadata))
+                        del self.pending_scans[key]
 
                     # 2. Process Notifications that are ready
                     # We send notifications after the same debounce delay as scans
@@ -961,7 +1252,7 @@ class PlexScanner:
                             # Clear pending files for these notifications
                             with self.pending_files_lock:
                                 for f in notif_data['added'] + notif_data['deleted']:
-                                    self.pending_files.discard(os.path.normpath(f))
+                                    self.pending_files.discard(_normpath(f))
                 
                 # Accumulate ready notifications into the buffer, then flush once the
                 # group window expires — this collapses burst events into one message.
@@ -1004,67 +1295,71 @@ class PlexScanner:
         elif total_added: color = Color.green()
         elif total_deleted: color = Color.red()
 
-        embed = Embed(
-            title=f"📂 Bulk Update: {len(notifications)} folders",
-            description=f"Detected **{total_added}** additions and **{total_deleted}** deletions across multiple folders.",
-            color=color,
-            timestamp=datetime.now()
-        )
+        # 20 folders per embed keeps under Discord's 25-field limit; the rest spill into follow-up
+        # embeds, which the notification worker delivers in the same webhook message.
+        chunks = [notifications[i:i + 20] for i in range(0, len(notifications), 20)]
+        for part, chunk in enumerate(chunks, 1):
+            title = f"📂 Bulk Update: {len(notifications)} folders"
+            if len(chunks) > 1:
+                title += f" ({part}/{len(chunks)})"
+            embed = Embed(
+                title=title,
+                description=f"Detected **{total_added}** additions and **{total_deleted}** deletions across multiple folders." if part == 1 else None,
+                color=color,
+                timestamp=datetime.now()
+            )
 
-        # Group by folder for fields
-        for root, data in notifications[:20]: # Limit to 20 folders to stay under Discord's 25 field limit
-            added = data['added']
-            deleted = data['deleted']
-            entity_name = os.path.basename(root)
-            
-            if entity_name.lower().startswith("season ") or entity_name.lower() in ["specials", "extras"]:
-                parent_name = os.path.basename(os.path.dirname(root))
-                if parent_name: entity_name = f"{parent_name} - {entity_name}"
-
-            msg = ""
-            if added: 
-                msg += f"✅ +{len(added)}\n"
-                # Try to add a direct link for the first added item if possible
-                if len(added) == 1 and self.plex:
-                    try:
-                        # Best effort link generation
-                        # We need to find the item in Plex first.
-                        # Since we just added it, it might be in the cache or readable via API.
-                        # We use the path to find the key.
-                        fpath = added[0]
-                        lid, _, _ = self.get_library_id_for_path(fpath)
-                        if lid:
-                            # Search by file path to get the key
-                            # This is a bit expensive so we only do it for single item adds to be safe?
-                            # Or we can construct a search URL.
-                            # A direct link to the library filter is safer and faster.
+            # Group by folder for fields
+            for root, data in chunk:
+                added = data['added']
+                deleted = data['deleted']
+                entity_name = os.path.basename(root)
+            
+                if _SEASONLIKE_RE.match(entity_name):
+                    parent_name = os.path.basename(os.path.dirname(root))
+                    if parent_name: entity_name = f"{parent_name} - {entity_name}"
+
+                msg = ""
+                if added: 
+                    msg += f"✅ +{len(added)}\n"
+                    # Try to add a direct link for the first added item if possible
+                    if len(added) == 1 and self.plex:
+                        try:
+                            # Best effort link generation
+                            # We need to find the item in Plex first.
+                            # Since we just added it, it might be in the cache or readable via API.
+                            # We use the path to find the key.
+                            fpath = added[0]
+                            lid, _, _ = self.get_library_id_for_path(fpath)
+                            if lid:
+                                # Search by file path to get the key
+                                # This is a bit expensive so we only do it for single item adds to be safe?
+                                # Or we can construct a search URL.
+                                # A direct link to the library filter is safer and faster.
                             
-                            # Construct a deep link to the library filtered by folder
-                            # This works even if the specific item ID isn't known yet
-                            # URL format: https://app.plex.tv/desktop/#!/server/{machineIdentifier}/details?key=%2Flibrary%2Fsections%2F{lid}%2Ffolder%3Fparent%3D{quote(root)}
-                            # Actually, linking to the folder view is more reliable for "added" events
+                                # Construct a deep link to the library filtered by folder
+                                # This works even if the specific item ID isn't known yet
+                                # URL format: https://app.plex.tv/desktop/#!/server/{machineIdentifier}/details?key=%2Flibrary%2Fsections%2F{lid}%2Ffolder%3Fparent%3D{quote(root)}
+                                # Actually, linking to the folder view is more reliable for "added" events
                             
-                            machine_id = self.plex.machineIdentifier
-                            # Plex Web URL usually needs to know the specific server UUID
-                            # We can try to generate a local link or app.plex.tv link
+                                machine_id = self.plex.machineIdentifier
+                                # Plex Web URL usually needs to know the specific server UUID
+                                # We can try to generate a local link or app.plex.tv link
                             
-                            # Let's link to the folder in Plex Web
-                            # /library/sections/{id}/folder?parent={path}
-                            encoded_root = quote(root)
-                            link = f"https://app.plex.tv/desktop/#!/server/{machine_id}/details?key=%2Flibrary%2Fsections%2F{lid}%2Ffolder%3Fparent%3D{encoded_root}"
-                            msg += f"[View in Plex]({link})\n"
-                    except Exception:
-                        pass
+                                # Let's link to the folder in Plex Web
+                                # /library/sections/{id}/folder?parent={path}
+                                encoded_root = quote(root)
+                                link = f"https://app.plex.tv/desktop/#!/server/{machine_id}/details?key=%2Flibrary%2Fsections%2F{lid}%2Ffolder%3Fparent%3D{encoded_root}"
+                                msg += f"[View in Plex]({link})\n"
+                        except Exception:
+                            pass
 
-            if deleted: msg += f"🗑️ -{len(deleted)}\n"
+                if deleted: msg += f"🗑️ -{len(deleted)}\n"
             
-            embed.add_field(name=f"📁 {entity_name}", value=msg or "No changes", inline=True)
+                embed.add_field(name=f"📁 {entity_name}", value=msg or "No changes", inline=True)
 
-        if len(notifications) > 20:
-            embed.add_field(name="...", value=f"and {len(notifications) - 20} more folders", inline=False)
-
-        embed.set_footer(text="Omniscan Media Monitor")
-        self._send_discord_embed(embed, event_type='update')
+            embed.set_footer(text="Omniscan Media Monitor")
+            self._send_discord_embed(embed, event_type='update')
 
     def _send_grouped_notification(self, entity_root, data):
         """Send a single Discord notification for multiple file events."""
@@ -1075,7 +1370,7 @@ class PlexScanner:
         metadata = data.get('metadata')
         
         # Check if entity_name is "Season X" or "Specials" and prepend parent folder name
-        if entity_name.lower().startswith("season ") or entity_name.lower() in ["specials", "extras"]:
+        if _SEASONLIKE_RE.match(entity_name):
             parent_name = os.path.basename(os.path.dirname(entity_root))
             if parent_name:
                 entity_name = f"{parent_name} - {entity_name}"
@@ -1187,6 +1482,8 @@ class PlexScanner:
                 if lib_id_int is not None and lib_id_int in self.library_files:
                     logger.debug(f"🧹 Invalidating cache (int) for library {lib_id_int} after scan")
                     del self.library_files[lib_id_int]
+            # The scan may have changed what the server reports for recently checked files
+            self._api_presence_cache.clear()
             
             # Recalculate missing files/counts in background
             self._trigger_cache_fill(library_id)
@@ -1417,8 +1714,10 @@ class PlexScanner:
         url = f"{self.config['PLEX_URL']}/library/sections/{library_id}/refresh?path={encoded_path}&X-Plex-Token={self.config['TOKEN']}"
         
         # Setup WebSocket Event if listener is active
+        # Several folders of one library can be scanned at once, so each keeps its own event
         scan_event = threading.Event()
-        self.active_scan_events[library_id] = scan_event
+        with self.active_scan_lock:
+            self.active_scan_events.setdefault(library_id, set()).add(scan_event)
         
         try:
             response = self.http_session.get(url)
@@ -1433,6 +1732,7 @@ class PlexScanner:
             max_wait = 600
             start_wait = time.time()
             poll_interval = 1.0
+            checked = False
             
             while True:
                 if time.time() - start_wait > max_wait:
@@ -1442,8 +1742,9 @@ class PlexScanner:
                 # Wait on Event if WebSocket alert listener is alive, acting as sleep
                 is_ws_active = self.plex_listener and self.plex_listener.is_alive()
                 if is_ws_active:
-                    # Wait for either event notification or poll timeout
-                    event_fired = scan_event.wait(timeout=poll_interval)
+                    # After the first status check the alert wakes us; /activities is only a safety net
+                    timeout = _PLEX_SCAN_VERIFY_INTERVAL if checked else poll_interval
+                    event_fired = scan_event.wait(timeout=timeout)
                     if event_fired:
                         logger.debug(f"WebSocket event received for: {folder_path}, verifying status...")
                         scan_event.clear()
@@ -1456,6 +1757,7 @@ class PlexScanner:
                         break
 
                     is_scanning = False
+                    checked = True
                     activities = self._get_plex_activities()
                     for activity in activities:
                         if activity.get('type') == 'library.refresh.section':
@@ -1509,7 +1811,12 @@ class PlexScanner:
             if isinstance(e, requests.RequestException):
                 self.plex = None
         finally:
-            self.active_scan_events.pop(library_id, None)
+            with self.active_scan_lock:
+                events = self.active_scan_events.get(library_id)
+                if events is not None:
+                    events.discard(scan_event)
+                    if not events:
+                        del self.active_scan_events[library_id]
     def get_plex_rating_key(self, file_path, library_id=None):
         """Query Plex API directly to get the rating key for a file path."""
         if not self.plex: return None
@@ -1530,7 +1837,7 @@ class PlexScanner:
             filename = os.path.basename(file_path)
             results = section.search(title=filename, libtype=libtype)
             
-            norm_target = os.path.normpath(file_path)
+            norm_target = _normpath(file_path)
             for item in results:
                 if hasattr(item, 'media'):
                     for media in item.media:
@@ -1656,26 +1963,45 @@ class PlexScanner:
         if not self.config.get('INTEGRITY_CHECK'):
             return True, None
 
+        # 1. Existence and 0-byte check from a single stat (each one is a round-trip on network mounts)
         try:
-            if not os.path.exists(file_path):
-                return False, "file not found"
-            
-            # 1. 0-byte check
-            size = os.path.getsize(file_path)
-            if size == 0:
-                return False, "0-byte file"
+            st = os.stat(file_path)
+            size = st.st_size
+        except FileNotFoundError:
+            return False, "file not found"
         except Exception as e:
             return False, f"error reading size: {e}"
+        if size == 0:
+            return False, "0-byte file"
 
         # 2. ffprobe check
         if self.config.get('FFPROBE_CHECK'):
-            import subprocess
+            cache_key = (file_path, size, st.st_mtime_ns)
+            with self._ffprobe_cache_lock:
+                cached = self._ffprobe_cache.get(cache_key)
+                if cached is not None:
+                    self._ffprobe_cache.move_to_end(cache_key)
+                    return cached
+            if self.config.get('QUICK_INTEGRITY_CHECK') and _container_complete(file_path, size):
+                return True, None
             try:
-                cmd = ["ffprobe", "-v", "error", "-show_format", "-show_streams", file_path]
+                # Only the container has to parse; a small single-threaded probe reads KBs rather than MBs
+                cmd = [
+                    "ffprobe", "-v", "error", "-threads", "1", "-probesize", "32K", "-analyzeduration", "0",
+                    "-show_entries", "format=duration", "-of", "default=noprint_wrappers=1:nokey=1", file_path,
+                ]
                 res = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=30)
                 if res.returncode != 0:
                     err_msg = res.stderr.strip() if res.stderr else f"exit code {res.returncode}"
-                    return False, f"ffprobe error: {err_msg}"
+                    result = (False, f"ffprobe error: {err_msg}")
+                else:
+                    result = (True, None)
+                # Only ffprobe's verdict is cached; timeouts and launch failures are retried next time
+                with self._ffprobe_cache_lock:
+                    self._ffprobe_cache[cache_key] = result
+                    if len(self._ffprobe_cache) > _FFPROBE_CACHE_SIZE:
+                        self._ffprobe_cache.popitem(last=False)
+                return result
             except subprocess.TimeoutExpired:
                 return False, "ffprobe timeout"
             except FileNotFoundError:
@@ -1686,6 +2012,12 @@ class PlexScanner:
 
         return True, None
 
+    def check_files_integrity(self, file_paths):
+        """check_file_integrity for several files, overlapping their ffprobe runs."""
+        if len(file_paths) < 2 or not (self.config.get('INTEGRITY_CHECK') and self.config.get('FFPROBE_CHECK')):
+            return [self.check_file_integrity(file_path) for file_path in file_paths]
+        return list(self.integrity_executor.map(self.check_file_integrity, file_paths))
+
     def submit_file_event(self, event_type, file_path, metadata=None):
         """Submit a file event for asynchronous processing."""
         if event_type == 'created' or event_type == 'moved':
@@ -1727,7 +2059,7 @@ class PlexScanner:
         if file_ext not in self.config['LIBRARY_EXTENSIONS']:
             return
 
-        if not self.is_in_library(file_path):
+        if not self.is_in_library(file_path, library_id):
             is_valid, reason = self.check_file_integrity(file_path)
             if not is_valid:
                 logger.warning(f"❌ File failed integrity validation ({reason}): {file_path}")
@@ -1737,7 +2069,7 @@ class PlexScanner:
                     stats.add_corrupt_item(file_path, reason)
                 return
 
-            norm_path = os.path.normpath(file_path)
+            norm_path = _normpath(file_path)
             with self.pending_files_lock:
                 if norm_path in self.pending_files:
                     return
@@ -1766,6 +2098,8 @@ class PlexScanner:
                     # If parent is library root (flat structure), scan specific file to avoid full scan
                     target_path = file_path if self.is_library_root(library_id, parent_folder) else parent_folder
                     
+                    scan_target = not self.is_ignored(target_path)
+                    # Record the notification and queue its scan in one critical section
                     with self.pending_scans_lock:
                         # Use target_path as key for notifications so they group correctly with the scan
                         if target_path not in self.pending_notifications:
@@ -1773,17 +2107,20 @@ class PlexScanner:
                             if metadata:
                                 self.pending_notifications[target_path]['metadata'] = metadata
                         self.pending_notifications[target_path]['added'].append(file_path)
+                        if scan_target:
+                            self._queue_scan_locked(library_id, target_path, {})
                     
-                    self.trigger_scan(library_id, target_path)
-                    
-                    # Update local cache to prevent repeated trigger on this upgrade
-                    with self.library_files_lock:
-                        fc = self.library_files.get(library_id)
-                        if isinstance(fc, dict) and norm_path in fc:
-                            try:
-                                fc[norm_path] = os.path.getsize(file_path)
-                            except Exception:
-                                pass
+                    # Update local cache to prevent repeated trigger on this upgrade.
+                    # Stat outside the lock: on network mounts it is a round-trip.
+                    fc = self.library_files.get(library_id)
+                    if isinstance(fc, dict) and norm_path in fc:
+                        try:
+                            new_size = os.path.getsize(file_path)
+                        except Exception:
+                            new_size = None
+                        if new_size is not None:
+                            with self.library_files_lock:
+                                fc[norm_path] = new_size
 
             if not should_scan:
                 with self.pending_files_lock:
@@ -1791,13 +2128,24 @@ class PlexScanner:
         else:
             if tracker: tracker.clear_entry(file_path)
 
-    def handle_deletion(self, file_path):
+    def handle_deletion(self, file_path, recheck=False):
         # Filter by extension first
         file_name = os.path.basename(file_path)
         file_ext = os.path.splitext(file_name)[1].lower()
         if file_ext not in self.config['MEDIA_EXTENSIONS']:
             return
 
+        if self.is_ignored(file_path):
+            return
+
+        if recheck:
+            # Second look after _DELETION_RECHECK_DELAY, queued by the first pass below
+            if os.path.exists(file_path):
+                logger.debug(f"False positive deletion ignored (file reappeared): {file_path}")
+                return
+            self._handle_confirmed_deletion(file_path)
+            return
+
         # Double-check if file is actually gone (to prevent Rclone/Network false positives)
         if os.path.exists(file_path):
             logger.debug(f"False positive deletion ignored (file exists): {file_path}")
@@ -1807,8 +2155,8 @@ class PlexScanner:
         # If the root of the scan is missing, the mount is likely down.
         scan_root = None
         for path in self.config['SCAN_PATHS']:
-             norm_p = os.path.normpath(path)
-             norm_f = os.path.normpath(file_path)
+             norm_p = _normpath(path)
+             norm_f = _normpath(file_path)
              if norm_f == norm_p or norm_f.startswith(norm_p + os.sep):
                  scan_root = path
                  break
@@ -1817,12 +2165,12 @@ class PlexScanner:
             logger.warning(f"🛑 Scan root not accessible: {scan_root}. Assuming mount failure. Ignoring deletion of {file_path}")
             return
         
-        # Small delay to filter out transient glitches (e.g. during renames or network hiccups)
-        time.sleep(2)
-        if os.path.exists(file_path):
-            logger.debug(f"False positive deletion ignored (file reappeared): {file_path}")
-            return
+        # Small delay to filter out transient glitches (e.g. during renames or network hiccups).
+        # The re-check is queued rather than slept on so event workers stay free during delete bursts.
+        self._deletion_rechecks.append((time.time() + _DELETION_RECHECK_DELAY, file_path))
+        self._deletion_recheck_wakeup.set()
 
+    def _handle_confirmed_deletion(self, file_path):
         # NEW: Early Library Check
         library_id, library_title, library_type = self.get_library_id_for_path(file_path)
         if not library_id:
@@ -1831,7 +2179,7 @@ class PlexScanner:
         logger.info(f"🗑️ File deleted: {BOLD}{file_path}{RESET}")
         
         if library_id or self.config.get('SERVER_TYPE') != 'plex':
-            norm_path = os.path.normpath(file_path)
+            norm_path = _normpath(file_path)
             with self.pending_files_lock:
                 if norm_path in self.pending_files:
                     return
@@ -1855,6 +2203,23 @@ class PlexScanner:
 
             self.trigger_scan(library_id, target_path, metadata={'event_type': 'deleted'})
 
+    def _get_scan_pacer(self):
+        """Token bucket enforcing SCAN_DELAY as an average across all scan workers, or None if unset.
+
+        The old per-file sleep in every worker allowed SCAN_WORKERS / SCAN_DELAY files per second;
+        the bucket keeps that rate but lets bursts through instead of idling each worker.
+        """
+        scan_delay = self.config.get('SCAN_DELAY', 0)
+        if not scan_delay or scan_delay <= 0:
+            return None
+        workers = self.config.get('SCAN_WORKERS', 4)
+        settings = (scan_delay, workers)
+        pacer = self._scan_pacer
+        if pacer is None or pacer[0] != settings:
+            pacer = (settings, _TokenBucket(rate=workers / scan_delay, capacity=workers * 8))
+            self._scan_pacer = pacer
+        return pacer[1]
+
     def scan_directory(self, path, stats, tracker, folders_to_scan, folders_to_scan_lock, force_full=False):
         cutoff_time = 0
         is_incremental = self.config.get('INCREMENTAL_SCAN') and not force_full
@@ -1862,19 +2227,29 @@ class PlexScanner:
             cutoff_time = time.time() - (self.config['SCAN_SINCE_DAYS'] * 86400)
 
         def process_files_in_dir(files_batch):
-            for file_path in files_batch:
-                if self.config['SCAN_DELAY'] > 0:
-                    time.sleep(self.config['SCAN_DELAY'])
+            # Settings read once per batch rather than per file; a config reload applies to the next batch
+            pacer = self._get_scan_pacer()
+            # Suffix tuples so the extension test is one str.endswith call, no splitext per file
+            media_exts = tuple(self.config['MEDIA_EXTENSIONS'])
+            library_exts = tuple(self.config['LIBRARY_EXTENSIONS'])
+            ignore_re = self.config.get('IGNORE_RE')
+            candidates = []
+            for entry in files_batch:
+                file_path = entry.path
+                if pacer is not None:
+                    pacer.acquire()
                     
-                file_name = os.path.basename(file_path)
+                # DirEntry.name is the basename already
+                file_name = entry.name
                 if file_name.startswith('.'):
                     continue
                     
-                file_ext = os.path.splitext(file_name)[1].lower()
-                if file_ext not in self.config['MEDIA_EXTENSIONS']:
+                lower_name = file_name.lower()
+                if not lower_name.endswith(media_exts):
                     continue
                     
-                if self.is_ignored(file_path):
+                # Same test as is_ignored(), reusing the basename we already have
+                if ignore_re and (ignore_re.match(file_path) or ignore_re.match(file_name)):
                     continue
                     
                 library_id, library_title, library_type = self.get_library_id_for_path(file_path)
@@ -1884,18 +2259,26 @@ class PlexScanner:
                 stats.increment_scanned()
                 SCANNED_FILES_TOTAL.inc()
 
-                if file_ext not in self.config['LIBRARY_EXTENSIONS']:
+                if not lower_name.endswith(library_exts):
                     continue
 
-                if self.is_in_library(file_path):
+                if self.is_in_library(file_path, library_id):
                     tracker.clear_entry(file_path)
                     continue
 
-                if self.config['SYMLINK_CHECK'] and self.is_broken_symlink(file_path):
-                    stats.increment_broken_symlinks()
+                # The DirEntry already knows (from d_type and its cached stat) whether this is
+                # a link whose target is gone; no extra lstat/stat round-trips per file.
+                if entry.is_symlink() and not entry.is_file():
+                    if self.config['SYMLINK_CHECK']:
+                        stats.increment_broken_symlinks()
                     continue
 
-                is_valid, reason = self.check_file_integrity(file_path)
+                candidates.append((file_path, library_id, library_title))
+
+            # Integrity checks last, so a folder of new episodes is probed concurrently
+            results = self.check_files_integrity([c[0] for c in candidates])
+            batch_folders = set()
+            for (file_path, library_id, library_title), (is_valid, reason) in zip(candidates, results):
                 if not is_valid:
                     logger.warning(f"❌ File failed integrity validation ({reason}): {file_path}")
                     tracker.add_event("Corrupt", file_path, reason)
@@ -1909,15 +2292,16 @@ class PlexScanner:
                         stats.add_missing_item(library_title, file_path)
                         parent_folder = os.path.dirname(file_path)
                         target_path = file_path if self.is_library_root(library_id, parent_folder) else parent_folder
-                        
-                        with folders_to_scan_lock:
-                            folders_to_scan.add((library_id, target_path))
+                        batch_folders.add((library_id, target_path))
+
+            # One shared-set update per batch instead of one lock round-trip per missing file
+            if batch_folders:
+                with folders_to_scan_lock:
+                    folders_to_scan.update(batch_folders)
 
         max_workers = self.config.get('SCAN_WORKERS', 4)
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             futures = []
-            from collections import deque
-            import concurrent.futures
             dirs_to_process = deque([path])
             
             while dirs_to_process:
@@ -1940,10 +2324,13 @@ class PlexScanner:
                                 
                             try:
                                 if entry.is_dir(follow_symlinks=True):
-                                    if not self.is_ignored(entry.path) and self.should_scan_directory(entry.path):
+                                    if not self._is_prunable_dir(entry) and self.should_scan_directory(entry.path):
                                         dirs_to_process.append(entry.path)
-                                elif entry.is_file(follow_symlinks=True) and not skip_files:
-                                    files_batch.append(entry.path)
+                                elif skip_files:
+                                    continue
+                                elif entry.is_file(follow_symlinks=True) or entry.is_symlink():
+                                    # Dangling links are kept so SYMLINK_CHECK can report them
+                                    files_batch.append(entry)
                             except OSError:
                                 pass
                 except OSError as e:
@@ -1968,33 +2355,45 @@ class PlexScanner:
                 except Exception as e:
                     logger.error(f"Error processing files in scan_directory: {e}")
 
+    def _scan_directories(self, pending_dirs, stats, tracker, folders_to_scan, folders_to_scan_lock, force_full=False):
+        """run_scan worker: take directories off the shared deque and scan them until it is empty."""
+        while True:
+            try:
+                dir_path = pending_dirs.popleft()
+            except IndexError:
+                return
+            self.scan_directory(dir_path, stats, tracker, folders_to_scan, folders_to_scan_lock, force_full)
+
     def run_scan(self, force_full=False):
-        from .models import RunStats, StuckFileTracker
         if self.is_scanning:
             logger.warning("Scan already in progress, skipping...")
             return
             
         self.is_scanning = True
+        tracker = None
         try:
             stats = RunStats(self.config)
             tracker = StuckFileTracker(config=self.config)
             
-            # Use lock when clearing and re-filling cache
-            with self.library_files_lock:
-                self.library_files.clear()
-                self.library_rating_keys.clear()
             with self.path_library_cache_lock:
                 self.path_library_cache.clear()
-            logger.info("Cache cleared for new scan")
             
             if not self.plex:
                 self.connect_to_plex()
 
             self.get_library_ids()
 
-            # Pre-cache libraries to prevent race conditions during parallel scanning
+            # Rebuild each library cache and swap it in whole, instead of clearing them all up front:
+            # watcher events during the refresh keep hitting the previous cache rather than a gap.
+            # Pre-caching also prevents race conditions during parallel scanning.
+            self._cache_all_libraries(refresh=True)
+            section_ids = {str(section['id']) for section in self.library_sections_cache}
+            with self.library_files_lock:
+                for library_id in [lid for lid in self.library_files if lid not in section_ids]:
+                    del self.library_files[library_id]
+                    self.library_rating_keys.pop(library_id, None)
+            logger.info("Library caches refreshed for new scan")
             for section in self.library_sections_cache:
-                self.cache_library_files(section['id'])
                 # Pre-calculate missing files count for UI statistics
                 # Optimization: Skip sequential pre-scan walk. Counts are populated during/after the scan.
                 with self.library_files_lock:
@@ -2008,7 +2407,9 @@ class PlexScanner:
             max_workers = self.config['SCAN_WORKERS']
             
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = []
+                # First-level directories from every scan path, drained by max_workers walkers
+                # instead of one queued future per directory (flat roots can hold tens of thousands)
+                top_dirs = deque()
                 
                 for SCAN_PATH in self.config['SCAN_PATHS']:
                     logger.info(f"\nScanning directory: {BOLD}{SCAN_PATH}{RESET}")
@@ -2026,8 +2427,8 @@ class PlexScanner:
                                 if entry.name.startswith('.'): continue
                                 
                                 if entry.is_dir():
-                                    if not self.is_ignored(entry.path) and self.should_scan_directory(entry.path):
-                                        futures.append(executor.submit(self.scan_directory, entry.path, stats, tracker, folders_to_scan, folders_to_scan_lock, force_full))
+                                    if not self._is_prunable_dir(entry) and self.should_scan_directory(entry.path):
+                                        top_dirs.append(entry.path)
                                 elif entry.is_file():
                                     file_path = entry.path
                                     if self.is_ignored(file_path): continue
@@ -2049,7 +2450,7 @@ class PlexScanner:
                                     if file_ext not in self.config['LIBRARY_EXTENSIONS']:
                                         continue
 
-                                    if self.is_in_library(file_path):
+                                    if self.is_in_library(file_path, library_id):
                                         tracker.clear_entry(file_path)
                                         continue
 
@@ -2076,6 +2477,10 @@ class PlexScanner:
                         logger.error(f"Error accessing {SCAN_PATH}: {e}")
                         continue
 
+                futures = [
+                    executor.submit(self._scan_directories, top_dirs, stats, tracker, folders_to_scan, folders_to_scan_lock, force_full)
+                    for _ in range(min(max_workers, len(top_dirs)))
+                ]
                 for future in futures:
                     future.result()
 
@@ -2088,7 +2493,7 @@ class PlexScanner:
                     self.trigger_scan(library_id, folder_path)
 
             tracker.save_history()
-            stats.send_discord_summary()
+            stats.send_discord_summary(tracker)
             
             # Recalculate missing files counts after scan completes
             for section in self.library_sections_cache:
@@ -2100,6 +2505,8 @@ class PlexScanner:
             logger.error(f"Error during scan: {e}")
         finally:
             self.is_scanning = False
+            if tracker is not None:
+                tracker.close()
             # Clear cache if NOT in watch mode.
             if not self.config.get('WATCH_MODE'):
                 with self.library_files_lock:
@@ -2118,7 +2525,6 @@ class PlexScanner:
     def scan_folder_async(self, folder_path, force_full=False):
         """Scan a specific folder, discover missing files, trigger media server scans, and send notifications."""
         def do_scan():
-            from .models import RunStats, StuckFileTracker
             stats = RunStats(self.config)
             tracker = StuckFileTracker(config=self.config)
             folders_to_scan = set()
@@ -2131,8 +2537,7 @@ class PlexScanner:
                 self.get_library_ids()
                 
                 # Pre-cache libraries to prevent race conditions during scanning
-                for section in self.library_sections_cache:
-                    self.cache_library_files(section['id'])
+                self._cache_all_libraries()
 
                 # 1. Scan the directory
                 self.scan_directory(folder_path, stats, tracker, folders_to_scan, folders_to_scan_lock, force_full)
@@ -2147,10 +2552,11 @@ class PlexScanner:
                         self.trigger_scan(library_id, path)
                 
                 # 3. Send the summary Discord notification
-                stats.send_discord_summary()
+                stats.send_discord_summary(tracker)
             except Exception as e:
                 logger.error(f"Error during folder scan for {folder_path}: {e}")
             finally:
+                tracker.close()
                 gc.collect()
 
         threading.Thread(target=do_scan, daemon=True).start()
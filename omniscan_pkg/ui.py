@@ -6,10 +6,9 @@ import time
 import json
 import pathlib
 import requests
-import configparser
 import logging
 import asyncio
-from .config import get_webhook_token, normalize_emby_url
+from .config import compile_ignore_patterns, get_webhook_token, normalize_emby_url, read_ini, write_ini
 from datetime import datetime
 from collections import defaultdict
 from plexapi.server import PlexServer
@@ -1453,6 +1452,7 @@ def init_ui(app, scanner):
                     c['DISCORD_WEBHOOK_URL'] = unmasked_webhook
                     c['NOTIFICATION_GROUP_WINDOW'] = int(notification_group_window.value)
                     c['IGNORE_PATTERNS'] = [p.strip() for p in ignore_patterns.value.replace(',', '\n').split('\n') if p.strip()]
+                    c['IGNORE_RE'] = compile_ignore_patterns(c['IGNORE_PATTERNS'])
                     c['LOG_LEVEL'] = log_level.value
 
                     c['CLEANUP_DAYS'] = int(cleanup_days.value)
@@ -1483,53 +1483,51 @@ def init_ui(app, scanner):
                             c['PATH_REWRITES'].append((parts[0].strip(), parts[1].strip()))
 
                     try:
-                        cfg = configparser.ConfigParser()
-                        cfg.read('config.ini')
-                        for sec in ['server', 'plex', 'behaviour', 'notifications', 'scan', 'ignore', 'logs', 'rewrite']:
-                            if not cfg.has_section(sec): cfg.add_section(sec)
-                        cfg.set('server', 'type', str(c['SERVER_TYPE']))
-                        cfg.set('server', 'url', str(c['SERVER_URL']))
-                        cfg.set('server', 'api_key', str(c['API_KEY']))
-                        cfg.set('plex', 'server', str(c['PLEX_URL']))
-                        cfg.set('plex', 'token', str(c['TOKEN']))
-                        cfg.set('behaviour', 'scan_workers', str(c['SCAN_WORKERS']))
-                        cfg.set('behaviour', 'scan_debounce', str(c['SCAN_DEBOUNCE']))
-                        cfg.set('behaviour', 'scan_delay', str(c['SCAN_DELAY']))
-                        cfg.set('behaviour', 'watch', str(c['WATCH_MODE']).lower())
-                        cfg.set('behaviour', 'run_interval', str(c['RUN_INTERVAL']))
-                        cfg.set('behaviour', 'run_on_startup', str(c['RUN_ON_STARTUP']).lower())
-                        cfg.set('behaviour', 'start_time', c['START_TIME'] if c['START_TIME'] else '')
-                        cfg.set('behaviour', 'incremental_scan', str(c['INCREMENTAL_SCAN']).lower())
-                        cfg.set('behaviour', 'scan_since_days', str(c['SCAN_SINCE_DAYS']))
-                        cfg.set('behaviour', 'symlink_check', str(c['SYMLINK_CHECK']).lower())
-                        cfg.set('behaviour', 'empty_trash', str(c['EMPTY_TRASH']).lower())
-                        cfg.set('behaviour', 'integrity_check', str(c['INTEGRITY_CHECK']).lower())
-                        cfg.set('behaviour', 'ffprobe_check', str(c['FFPROBE_CHECK']).lower())
-                        cfg.set('behaviour', 'deletion_threshold', str(c['DELETION_THRESHOLD']))
-                        cfg.set('behaviour', 'abort_on_mass_deletion', str(c['ABORT_ON_MASS_DELETION']).lower())
-                        cfg.set('notifications', 'enabled', str(c['NOTIFICATIONS_ENABLED']).lower())
-                        cfg.set('notifications', 'discord_webhook_url', str(c['DISCORD_WEBHOOK_URL']))
-                        cfg.set('behaviour', 'notification_group_window', str(c['NOTIFICATION_GROUP_WINDOW']))
-
-                        cfg.set('behaviour', 'cleanup_days', str(c['CLEANUP_DAYS']))
-                        cfg.set('behaviour', 'plex_analyze', str(c['PLEX_ANALYZE']).lower())
-                        cfg.set('behaviour', 'plex_refresh', str(c['PLEX_REFRESH']).lower())
-                        cfg.set('notifications', 'mention_users', ','.join(c['DISCORD_MENTION_USERS']))
-                        cfg.set('notifications', 'mention_roles', ','.join(c['DISCORD_MENTION_ROLES']))
-                        cfg.set('notifications', 'mention_everyone', str(c['DISCORD_MENTION_EVERYONE']).lower())
-                        cfg.set('notifications', 'mention_here', str(c['DISCORD_MENTION_HERE']).lower())
-                        cfg.set('notifications', 'mention_events', ','.join(c['DISCORD_MENTION_EVENTS']))
-                        cfg.set('scan', 'directories', ','.join(c['SCAN_PATHS']))
-                        cfg.set('scan', 'watch_directories', '')
-                        cfg.set('ignore', 'patterns', ','.join(c['IGNORE_PATTERNS']))
-                        cfg.set('logs', 'loglevel', str(c['LOG_LEVEL']))
-                        cfg.set('rewrite', 'mappings', ','.join([f'{src}:{dst}' for src, dst in c['PATH_REWRITES']]))
-                        if not cfg.has_section('web'): cfg.add_section('web')
-                        cfg.set('web', 'username', str(c['WEB_USERNAME']))
-                        cfg.set('web', 'password', str(c['WEB_PASSWORD']))
-                        cfg.set('web', 'auth_disabled', str(c['WEB_AUTH_DISABLED']).lower())
-
-                        with open('config.ini', 'w') as f: cfg.write(f)
+                        cfg = read_ini('config.ini', copy=True)
+                        for sec in ['server', 'plex', 'behaviour', 'notifications', 'scan', 'ignore', 'logs', 'rewrite', 'web']:
+                            cfg.setdefault(sec, {})
+                        cfg['server']['type'] = str(c['SERVER_TYPE'])
+                        cfg['server']['url'] = str(c['SERVER_URL'])
+                        cfg['server']['api_key'] = str(c['API_KEY'])
+                        cfg['plex']['server'] = str(c['PLEX_URL'])
+                        cfg['plex']['token'] = str(c['TOKEN'])
+                        cfg['behaviour']['scan_workers'] = str(c['SCAN_WORKERS'])
+                        cfg['behaviour']['scan_debounce'] = str(c['SCAN_DEBOUNCE'])
+                        cfg['behaviour']['scan_delay'] = str(c['SCAN_DELAY'])
+                        cfg['behaviour']['watch'] = str(c['WATCH_MODE']).lower()
+                        cfg['behaviour']['run_interval'] = str(c['RUN_INTERVAL'])
+                        cfg['behaviour']['run_on_startup'] = str(c['RUN_ON_STARTUP']).lower()
+                        cfg['behaviour']['start_time'] = c['START_TIME'] if c['START_TIME'] else ''
+                        cfg['behaviour']['incremental_scan'] = str(c['INCREMENTAL_SCAN']).lower()
+                        cfg['behaviour']['scan_since_days'] = str(c['SCAN_SINCE_DAYS'])
+                        cfg['behaviour']['symlink_check'] = str(c['SYMLINK_CHECK']).lower()
+                        cfg['behaviour']['empty_trash'] = str(c['EMPTY_TRASH']).lower()
+                        cfg['behaviour']['integrity_check'] = str(c['INTEGRITY_CHECK']).lower()
+                        cfg['behaviour']['ffprobe_check'] = str(c['FFPROBE_CHECK']).lower()
+                        cfg['behaviour']['deletion_threshold'] = str(c['DELETION_THRESHOLD'])
+                        cfg['behaviour']['abort_on_mass_deletion'] = str(c['ABORT_ON_MASS_DELETION']).lower()
+                        cfg['notifications']['enabled'] = str(c['NOTIFICATIONS_ENABLED']).lower()
+                        cfg['notifications']['discord_webhook_url'] = str(c['DISCORD_WEBHOOK_URL'])
+                        cfg['behaviour']['notification_group_window'] = str(c['NOTIFICATION_GROUP_WINDOW'])
+
+                        cfg['behaviour']['cleanup_days'] = str(c['CLEANUP_DAYS'])
+                        cfg['behaviour']['plex_analyze'] = str(c['PLEX_ANALYZE']).lower()
+                        cfg['behaviour']['plex_refresh'] = str(c['PLEX_REFRESH']).lower()
+                        cfg['notifications']['mention_users'] = ','.join(c['DISCORD_MENTION_USERS'])
+                        cfg['notifications']['mention_roles'] = ','.join(c['DISCORD_MENTION_ROLES'])
+                        cfg['notifications']['mention_everyone'] = str(c['DISCORD_MENTION_EVERYONE']).lower()
+                        cfg['notifications']['mention_here'] = str(c['DISCORD_MENTION_HERE']).lower()
+                        cfg['notifications']['mention_events'] = ','.join(c['DISCORD_MENTION_EVENTS'])
+                        cfg['scan']['directories'] = ','.join(c['SCAN_PATHS'])
+                        cfg['scan']['watch_directories'] = ''
+                        cfg['ignore']['patterns'] = ','.join(c['IGNORE_PATTERNS'])
+                        cfg['logs']['loglevel'] = str(c['LOG_LEVEL'])
+                        cfg['rewrite']['mappings'] = ','.join([f'{src}:{dst}' for src, dst in c['PATH_REWRITES']])
+                        cfg['web']['username'] = str(c['WEB_USERNAME'])
+                        cfg['web']['password'] = str(c['WEB_PASSWORD'])
+                        cfg['web']['auth_disabled'] = str(c['WEB_AUTH_DISABLED']).lower()
+
+                        write_ini(cfg, 'config.ini')
 
                         if c['SERVER_TYPE'] == 'plex':
                             scanner.connect_to_plex(retry=False)
@@ -1736,20 +1734,18 @@ def init_ui(app, scanner):
                             c['SCAN_PATHS'] = [p.strip() for p in scan_directories_field.value.replace(',', '\n').split('\n') if p.strip()]
                             
                             try:
-                                cfg = configparser.ConfigParser()
-                                cfg.read('config.ini')
+                                cfg = read_ini('config.ini', copy=True)
                                 for sec in ['web', 'server', 'plex', 'scan']:
-                                    if not cfg.has_section(sec): cfg.add_section(sec)
-                                cfg.set('web', 'username', str(c['WEB_USERNAME']))
-                                cfg.set('web', 'password', str(c['WEB_PASSWORD']))
-                                cfg.set('server', 'type', str(c['SERVER_TYPE']))
-                                cfg.set('server', 'url', str(c['SERVER_URL']))
-                                cfg.set('server', 'api_key', str(c['API_KEY']))
-                                cfg.set('plex', 'server', str(c['PLEX_URL']))
-                                cfg.set('plex', 'token', str(c['TOKEN']))
-                                cfg.set('scan', 'directories', ",".join(c['SCAN_PATHS']))
-                                with open('config.ini', 'w') as f:
-                                    cfg.write(f)
+                                    cfg.setdefault(sec, {})
+                                cfg['web']['username'] = str(c['WEB_USERNAME'])
+                                cfg['web']['password'] = str(c['WEB_PASSWORD'])
+                                cfg['server']['type'] = str(c['SERVER_TYPE'])
+                                cfg['server']['url'] = str(c['SERVER_URL'])
+                                cfg['server']['api_key'] = str(c['API_KEY'])
+                                cfg['plex']['server'] = str(c['PLEX_URL'])
+                                cfg['plex']['token'] = str(c['TOKEN'])
+                                cfg['scan']['directories'] = ",".join(c['SCAN_PATHS'])
+                                write_ini(cfg, 'config.ini')
                                     
                                 if c['SERVER_TYPE'] == 'plex':
                                     scanner.connect_to_plex(retry=False)
@@ -11,6 +11,8 @@ class PlexWatcher(FileSystemEventHandler):
         self.scanner = scanner
 
     def on_created(self, event):
+        if self.scanner.is_ignored(event.src_path):
+            return
         if not event.is_directory:
             self.scanner.submit_file_event('created', event.src_path)
         else:
@@ -21,6 +23,8 @@ class PlexWatcher(FileSystemEventHandler):
                 self.scanner.trigger_scan(lid, event.src_path)
 
     def on_moved(self, event):
+        if self.scanner.is_ignored(event.dest_path):
+            return
         if not event.is_directory:
             self.scanner.submit_file_event('moved', event.dest_path)
         else:
@@ -31,6 +35,8 @@ class PlexWatcher(FileSystemEventHandler):
                 self.scanner.trigger_scan(lid, event.dest_path)
 
     def on_deleted(self, event):
+        if self.scanner.is_ignored(event.src_path):
+            return
         if not event.is_directory:
             self.scanner.submit_file_event('deleted', event.src_path)
         else:
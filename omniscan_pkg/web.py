@@ -19,7 +19,7 @@ from nicegui import ui, app as nicegui_app
 nicegui_app.config.socket_io_js_transports = ['polling', 'websocket']
 from plexapi.server import PlexServer
 from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
-from .config import get_webhook_token, load_config, normalize_emby_url
+from .config import compile_ignore_patterns, get_webhook_token, load_config, normalize_emby_url, read_ini, write_ini
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from .webhook_parser import parse_webhook
 from .ui import init_ui
@@ -123,10 +123,7 @@ def _derive_secret_key():
         return explicit
     # Try to read WEB_PASSWORD from config.ini for a stable key
     try:
-        import configparser
-        _cfg = configparser.ConfigParser()
-        _cfg.read('config.ini')
-        _pw = _cfg.get('web', 'password', fallback=None) or os.environ.get('WEB_PASSWORD')
+        _pw = read_ini('config.ini').get('web', {}).get('password') or os.environ.get('WEB_PASSWORD')
         if _pw:
             import hashlib
             return hashlib.sha256(f"omniscan-session-key:{_pw}".encode()).hexdigest()
@@ -519,25 +516,22 @@ async def setup_submit(r: SetupSubmit, request: Request):
     c['SCAN_PATHS'] = [p.strip() for p in r.scan_directories.replace(',', '\n').split('\n') if p.strip()]
 
     try:
-        cfg = configparser.ConfigParser()
-        cfg.read('config.ini')
+        cfg = read_ini('config.ini', copy=True)
         
         sections_to_check = ['web', 'server', 'plex', 'scan']
         for sec in sections_to_check:
-            if not cfg.has_section(sec):
-                cfg.add_section(sec)
+            cfg.setdefault(sec, {})
         
-        cfg.set('web', 'username', str(c['WEB_USERNAME']))
-        cfg.set('web', 'password', str(c['WEB_PASSWORD']))
-        cfg.set('server', 'type', str(c['SERVER_TYPE']))
-        cfg.set('server', 'url', str(c['SERVER_URL']))
-        cfg.set('server', 'api_key', str(c['API_KEY']))
-        cfg.set('plex', 'server', str(c['PLEX_URL']))
-        cfg.set('plex', 'token', str(c['TOKEN']))
-        cfg.set('scan', 'directories', ",".join(c['SCAN_PATHS']))
-
-        with open('config.ini', 'w') as f:
-            cfg.write(f)
+        cfg['web']['username'] = str(c['WEB_USERNAME'])
+        cfg['web']['password'] = str(c['WEB_PASSWORD'])
+        cfg['server']['type'] = str(c['SERVER_TYPE'])
+        cfg['server']['url'] = str(c['SERVER_URL'])
+        cfg['server']['api_key'] = str(c['API_KEY'])
+        cfg['plex']['server'] = str(c['PLEX_URL'])
+        cfg['plex']['token'] = str(c['TOKEN'])
+        cfg['scan']['directories'] = ",".join(c['SCAN_PATHS'])
+
+        write_ini(cfg, 'config.ini')
 
         request.session["user"] = r.username
         
@@ -580,6 +574,7 @@ async def update_settings(s: SettingsUpdate, u: str = Depends(get_current_user))
     c['DISCORD_WEBHOOK_URL'] = unmask_v(s.discord_webhook_url, c.get('DISCORD_WEBHOOK_URL', ''))
     c['NOTIFICATION_GROUP_WINDOW'] = s.notification_group_window
     c['IGNORE_PATTERNS'] = [p.strip() for p in s.ignore_patterns.replace(',', '\n').split('\n') if p.strip()]
+    c['IGNORE_RE'] = compile_ignore_patterns(c['IGNORE_PATTERNS'])
     c['LOG_LEVEL'] = s.log_level
     
     c['PATH_REWRITES'] = []
@@ -591,38 +586,37 @@ async def update_settings(s: SettingsUpdate, u: str = Depends(get_current_user))
             c['PATH_REWRITES'].append((parts[0].strip(), parts[1].strip()))
 
     try:
-        cfg = configparser.ConfigParser()
-        cfg.read('config.ini')
+        cfg = read_ini('config.ini', copy=True)
         for sec in ['server', 'plex', 'behaviour', 'notifications', 'scan', 'ignore', 'logs', 'rewrite']:
-            if not cfg.has_section(sec): cfg.add_section(sec)
-        cfg.set('server', 'type', str(c['SERVER_TYPE']))
-        cfg.set('server', 'url', str(c['SERVER_URL']))
-        cfg.set('server', 'api_key', str(c['API_KEY']))
-        cfg.set('plex', 'server', str(c['PLEX_URL']))
-        cfg.set('plex', 'token', str(c['TOKEN']))
-        cfg.set('behaviour', 'scan_workers', str(c['SCAN_WORKERS']))
-        cfg.set('behaviour', 'scan_debounce', str(c['SCAN_DEBOUNCE']))
-        cfg.set('behaviour', 'scan_delay', str(c['SCAN_DELAY']))
-        cfg.set('behaviour', 'watch', str(c['WATCH_MODE']).lower())
-        cfg.set('behaviour', 'run_interval', str(c['RUN_INTERVAL']))
-        cfg.set('behaviour', 'run_on_startup', str(c['RUN_ON_STARTUP']).lower())
-        cfg.set('behaviour', 'start_time', c['START_TIME'] if c['START_TIME'] else "")
-        cfg.set('behaviour', 'incremental_scan', str(c['INCREMENTAL_SCAN']).lower())
-        cfg.set('behaviour', 'scan_since_days', str(c['SCAN_SINCE_DAYS']))
-        cfg.set('behaviour', 'symlink_check', str(c['SYMLINK_CHECK']).lower())
-        cfg.set('behaviour', 'empty_trash', str(c['EMPTY_TRASH']).lower())
-        cfg.set('behaviour', 'integrity_check', str(c['INTEGRITY_CHECK']).lower())
-        cfg.set('behaviour', 'ffprobe_check', str(c['FFPROBE_CHECK']).lower())
-        cfg.set('behaviour', 'deletion_threshold', str(c['DELETION_THRESHOLD']))
-        cfg.set('behaviour', 'abort_on_mass_deletion', str(c['ABORT_ON_MASS_DELETION']).lower())
-        cfg.set('notifications', 'enabled', str(c['NOTIFICATIONS_ENABLED']).lower())
-        cfg.set('notifications', 'discord_webhook_url', str(c['DISCORD_WEBHOOK_URL']))
-        cfg.set('behaviour', 'notification_group_window', str(c['NOTIFICATION_GROUP_WINDOW']))
-        cfg.set('ignore', 'patterns', ",".join(c['IGNORE_PATTERNS']))
-        cfg.set('logs', 'loglevel', str(c['LOG_LEVEL']))
-        cfg.set('rewrite', 'mappings', ",".join([f"{src}:{dst}" for src, dst in c['PATH_REWRITES']]))
+            cfg.setdefault(sec, {})
+        cfg['server']['type'] = str(c['SERVER_TYPE'])
+        cfg['server']['url'] = str(c['SERVER_URL'])
+        cfg['server']['api_key'] = str(c['API_KEY'])
+        cfg['plex']['server'] = str(c['PLEX_URL'])
+        cfg['plex']['token'] = str(c['TOKEN'])
+        cfg['behaviour']['scan_workers'] = str(c['SCAN_WORKERS'])
+        cfg['behaviour']['scan_debounce'] = str(c['SCAN_DEBOUNCE'])
+        cfg['behaviour']['scan_delay'] = str(c['SCAN_DELAY'])
+        cfg['behaviour']['watch'] = str(c['WATCH_MODE']).lower()
+        cfg['behaviour']['run_interval'] = str(c['RUN_INTERVAL'])
+        cfg['behaviour']['run_on_startup'] = str(c['RUN_ON_STARTUP']).lower()
+        cfg['behaviour']['start_time'] = c['START_TIME'] if c['START_TIME'] else ""
+        cfg['behaviour']['incremental_scan'] = str(c['INCREMENTAL_SCAN']).lower()
+        cfg['behaviour']['scan_since_days'] = str(c['SCAN_SINCE_DAYS'])
+        cfg['behaviour']['symlink_check'] = str(c['SYMLINK_CHECK']).lower()
+        cfg['behaviour']['empty_trash'] = str(c['EMPTY_TRASH']).lower()
+        cfg['behaviour']['integrity_check'] = str(c['INTEGRITY_CHECK']).lower()
+        cfg['behaviour']['ffprobe_check'] = str(c['FFPROBE_CHECK']).lower()
+        cfg['behaviour']['deletion_threshold'] = str(c['DELETION_THRESHOLD'])
+        cfg['behaviour']['abort_on_mass_deletion'] = str(c['ABORT_ON_MASS_DELETION']).lower()
+        cfg['notifications']['enabled'] = str(c['NOTIFICATIONS_ENABLED']).lower()
+        cfg['notifications']['discord_webhook_url'] = str(c['DISCORD_WEBHOOK_URL'])
+        cfg['behaviour']['notification_group_window'] = str(c['NOTIFICATION_GROUP_WINDOW'])
+        cfg['ignore']['patterns'] = ",".join(c['IGNORE_PATTERNS'])
+        cfg['logs']['loglevel'] = str(c['LOG_LEVEL'])
+        cfg['rewrite']['mappings'] = ",".join([f"{src}:{dst}" for src, dst in c['PATH_REWRITES']])
         
-        with open('config.ini', 'w') as f: cfg.write(f)
+        write_ini(cfg, 'config.ini')
         
         if c['SERVER_TYPE'] == 'plex': 
             scanner_instance.connect_to_plex(retry=False)
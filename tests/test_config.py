@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from omniscan_pkg.config import MEDIA_EXTENSIONS, FastConfigParser, load_config, read_ini, write_ini
+
+SAMPLE_INI = """
+[server]
+type = Jellyfin
+url = http://localhost:8096
+
+# comment line
+[scan]
+directories =
+    /mnt/media/tv
+    /mnt/media/movies
+Library_Extensions: .mkv,.mp4
+
+[behaviour]
+scan_workers = 8
+watch = true
+start_time =
+
+[ignore]
+patterns = *.tmp,
+    sample*
+"""
+
+class TestConfig(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.ini')
+        with os.fdopen(fd, 'w') as f:
+            f.write(SAMPLE_INI)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_fast_parser(self):
+        data = FastConfigParser().parse(self.path)
+        self.assertEqual(data['server']['type'], 'Jellyfin')
+        self.assertEqual(data['scan']['directories'], '/mnt/media/tv\n/mnt/media/movies')
+        # Option names are case-insensitive, like ConfigParser
+        self.assertEqual(data['scan']['library_extensions'], '.mkv,.mp4')
+        self.assertEqual(data['behaviour']['start_time'], '')
+
+    def test_fast_parser_missing_file(self):
+        self.assertEqual(FastConfigParser().parse(self.path + '.missing'), {})
+
+    def test_read_ini_cached_until_mtime_changes(self):
+        first = read_ini(self.path)
+        self.assertIs(read_ini(self.path), first)
+
+        with open(self.path, 'a') as f:
+            f.write("\n[logs]\nloglevel = DEBUG\n")
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        second = read_ini(self.path)
+        self.assertIsNot(second, first)
+        self.assertEqual(second['logs']['loglevel'], 'DEBUG')
+
+    def test_write_ini_round_trip(self):
+        data = read_ini(self.path, copy=True)
+        data.setdefault('web', {})['password'] = 'p%ss'
+        write_ini(data, self.path)
+        self.assertEqual(FastConfigParser().parse(self.path), data)
+
+    def test_write_ini_invalidates_cache(self):
+        data = read_ini(self.path, copy=True)
+        st = os.stat(self.path)
+        data['server']['type'] = 'Emby'
+        write_ini(data, self.path)
+        # Simulate a filesystem whose timestamp did not move within the same tick
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        self.assertEqual(read_ini(self.path)['server']['type'], 'Emby')
+
+    @patch.dict(os.environ, {'SCAN_WORKERS': '2'})
+    def test_load_config(self):
+        cfg = load_config(self.path)
+        self.assertEqual(cfg['SERVER_TYPE'], 'jellyfin')
+        self.assertEqual(cfg['SCAN_PATHS'], ['/mnt/media/movies', '/mnt/media/tv'])
+        self.assertEqual(cfg['LIBRARY_EXTENSIONS'], {'.mkv', '.mp4'})
+        self.assertTrue(cfg['WATCH_MODE'])
+        self.assertEqual(cfg['SCAN_WORKERS'], 2)  # env var wins over config.ini
+        self.assertEqual(cfg['SCAN_DEBOUNCE'], 30)
+        self.assertIs(cfg['MEDIA_EXTENSIONS'], MEDIA_EXTENSIONS)
+        self.assertEqual(cfg['IGNORE_PATTERNS'], ['*.tmp', 'sample*'])
+        self.assertTrue(cfg['IGNORE_RE'].match('sample.mkv'))
+        self.assertIsNone(cfg['IGNORE_RE'].match('movie.mkv'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -32,7 +32,7 @@ class TestDeletionLogic(unittest.TestCase):
         # mock_exists calls:
         # 1. exists(file_path) -> False (Initial check)
         # 2. exists(scan_root) -> True (Mount check)
-        # 3. exists(file_path) -> False (After sleep check)
+        # 3. exists(file_path) -> False (Re-check)
         
         # We need to distinguish between file check and root check.
         def side_effect(path):
@@ -44,7 +44,13 @@ class TestDeletionLogic(unittest.TestCase):
         
         self.scanner.handle_deletion('/mnt/usenet-rclone/tv/movie.mkv')
         
-        mock_sleep.assert_called_once_with(2)
+        # The re-check is queued instead of sleeping on the event worker
+        mock_sleep.assert_not_called()
+        self.scanner.trigger_scan.assert_not_called()
+        self.assertEqual([p for _, p in self.scanner._deletion_rechecks], ['/mnt/usenet-rclone/tv/movie.mkv'])
+        self.scanner._deletion_rechecks.clear()
+
+        self.scanner.handle_deletion('/mnt/usenet-rclone/tv/movie.mkv', recheck=True)
         # Should proceed to trigger scan
         self.scanner.trigger_scan.assert_called()
 
@@ -59,8 +65,9 @@ class TestDeletionLogic(unittest.TestCase):
         
         self.scanner.handle_deletion('/mnt/usenet-rclone/tv/movie.mkv')
         
-        # Should abort before sleep
+        # Should abort before queueing a re-check
         mock_sleep.assert_not_called()
+        self.assertFalse(self.scanner._deletion_rechecks)
         self.scanner.trigger_scan.assert_not_called()
 
     @patch('os.path.exists')
@@ -73,8 +80,8 @@ class TestDeletionLogic(unittest.TestCase):
                 # But wait, logic is:
                 # 1. if exists(file): return
                 # 2. if not exists(root): return
-                # 3. sleep(2)
-                # 4. if exists(file): return
+                # 3. queue a re-check
+                # 4. (re-check) if exists(file): return
                 pass
             return True 
         
@@ -85,8 +92,11 @@ class TestDeletionLogic(unittest.TestCase):
         mock_exists.side_effect = [False, True, True]
         
         self.scanner.handle_deletion('/mnt/usenet-rclone/tv/movie.mkv')
+        self.assertEqual(len(self.scanner._deletion_rechecks), 1)
+        self.scanner._deletion_rechecks.clear()
+        self.scanner.handle_deletion('/mnt/usenet-rclone/tv/movie.mkv', recheck=True)
         
-        mock_sleep.assert_called_once_with(2)
+        mock_sleep.assert_not_called()
         # Should not trigger scan
         self.scanner.trigger_scan.assert_not_called()
 
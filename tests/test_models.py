@@ -0,0 +1,141 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from omniscan_pkg.models import RunStats, StuckFileTracker
+
+class TestStuckFileTracker(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.tracker = StuckFileTracker(db_file=os.path.join(self.tmpdir, 'history.db'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_connection_reused_per_thread(self):
+        conn = self.tracker._conn()
+        self.assertIs(self.tracker._conn(), conn)
+
+        other = []
+        t = threading.Thread(target=lambda: other.append(self.tracker._conn()))
+        t.start()
+        t.join()
+        self.assertIsNot(other[0], conn)
+
+        self.tracker.close()
+        self.assertIsNot(self.tracker._conn(), conn)
+        self.assertEqual(self.tracker.get_history(), [])
+
+    def test_dead_thread_connections_closed(self):
+        def worker(i):
+            self.tracker.add_event("Scan Triggered", f"/data/{i}", "plex")
+            self.tracker.flush()
+
+        for i in range(20):
+            t = threading.Thread(target=worker, args=(i,))
+            t.start()
+            t.join()
+        # Each new thread closes the previous one's handle: only the main thread's
+        # connection and the most recent worker's remain
+        self.assertLessEqual(len(self.tracker._conns), 2)
+        self.assertEqual(len(self.tracker.get_history()), 20)
+
+    def test_events_and_stuck_files(self):
+        self.tracker.add_event("Corrupt", "/data/movie.mkv", "0-byte file")
+        history = self.tracker.get_history()
+        self.assertEqual(len(history), 1)
+        self.assertEqual(history[0][1:], ("Corrupt", "/data/movie.mkv", "0-byte file"))
+        self.assertRegex(history[0][0], r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$')
+        self.assertEqual(self.tracker.get_corrupt_count(), 1)
+
+        self.assertFalse(self.tracker.increment_attempt("/data/movie.mkv"))
+        self.assertEqual(len(self.tracker.get_all_stuck()), 1)
+        self.tracker.clear_entry("/data/movie.mkv")
+        self.assertEqual(self.tracker.get_all_stuck(), [])
+
+    def test_history_search(self):
+        self.tracker.add_event("Scan Triggered", "/mnt/tv/Breaking Bad/Season 01", "plex")
+        self.tracker.add_event("Corrupt", "/mnt/movies/Heat.mkv", "0-byte file")
+        # FTS (when this SQLite has FTS5 trigram) and the LIKE fallback must agree
+        for fts_enabled in sorted({self.tracker.fts_enabled, False}):
+            with self.subTest(fts_enabled=fts_enabled):
+                self.tracker.fts_enabled = fts_enabled
+                # Substring, case-insensitive matching like the previous LIKE query
+                self.assertEqual([r[2] for r in self.tracker.get_history(search="reaking")], ["/mnt/tv/Breaking Bad/Season 01"])
+                self.assertEqual([r[1] for r in self.tracker.get_history(search="corr")], ["Corrupt"])
+                # Terms shorter than a trigram fall back to LIKE
+                self.assertEqual(len(self.tracker.get_history(search="He")), 1)
+                self.assertEqual(self.tracker.get_history(search='"quoted"'), [])
+
+    def test_prune_runs_after_insert(self):
+        self.tracker.PRUNE_EVERY = 2
+        conn = self.tracker._conn()
+        with conn:
+            conn.execute("INSERT INTO events (timestamp, event_type, details, status) VALUES ('2000-01-01 00:00:00', 'Corrupt', '/old.mkv', 'x')")
+        self.tracker.add_event("Corrupt", "/new1.mkv", "x")
+        self.assertEqual(self.tracker.get_corrupt_count(), 2)
+        self.tracker.add_event("Corrupt", "/new2.mkv", "x")
+        self.assertEqual([r[2] for r in self.tracker.get_history()], ["/new2.mkv", "/new1.mkv"])
+
+    def test_events_buffered_until_flush(self):
+        self.tracker.EVENT_BUFFER_LIMIT = 3
+        count = lambda: self.tracker._conn().execute('SELECT COUNT(*) FROM events').fetchone()[0]
+        self.tracker.add_event("Corrupt", "/a.mkv", "x")
+        self.tracker.add_event("Corrupt", "/b.mkv", "x")
+        self.assertEqual(count(), 0)
+        self.tracker.add_event("Corrupt", "/c.mkv", "x")
+        self.assertEqual(count(), 3)
+        self.tracker.add_event("Corrupt", "/d.mkv", "x")
+        RunStats({'DRY_RUN': True}).send_discord_summary(self.tracker)
+        self.assertEqual(count(), 4)
+
+    def test_reads_do_not_take_writer_lock(self):
+        self.tracker.add_event("Corrupt", "/data/movie.mkv", "0-byte file")
+        with self.tracker.lock:
+            self.assertEqual(len(self.tracker.get_history()), 1)
+            self.assertEqual(self.tracker.get_corrupt_count(), 1)
+            self.assertEqual(self.tracker.get_all_stuck(), [])
+
+    def test_increment_attempt_upsert(self):
+        path = "/data/show/episode.mkv"
+        results = [self.tracker.increment_attempt(path) for _ in range(self.tracker.max_retries + 1)]
+        self.assertEqual(results, [False] * self.tracker.max_retries + [True])
+        self.assertEqual(self.tracker.get_all_stuck()[0][1], self.tracker.max_retries + 1)
+        self.assertIn(path, self.tracker.stuck_paths)
+
+    def test_increment_attempt_without_returning(self):
+        self.tracker.UPSERT_RETURNING = False
+        self.tracker.UPSERT_ATTEMPT_SQL = StuckFileTracker.UPSERT_ATTEMPT_SQL.replace(' RETURNING attempts', '')
+        self.assertFalse(self.tracker.increment_attempt("/data/a.mkv"))
+        self.assertEqual(self.tracker.get_all_stuck()[0][1], 1)
+        self.tracker.increment_attempt("/data/a.mkv")
+        self.assertEqual(self.tracker.get_all_stuck()[0][1], 2)
+
+class TestRunStats(unittest.TestCase):
+    def test_per_thread_accumulators_merge(self):
+        stats = RunStats({})
+
+        def worker(n):
+            for i in range(100):
+                stats.increment_scanned()
+                stats.add_missing_item("Movies", f"/data/{n}/{i}.mkv")
+            stats.add_stuck_item(f"/data/{n}/stuck.mkv")
+            stats.add_corrupt_item(f"/data/{n}/bad.mkv", "0-byte file")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(stats.total_scanned, 400)
+        self.assertEqual(stats.total_missing, 400)
+        self.assertEqual(stats.missing_counts["Movies"], 400)
+        self.assertEqual(len(stats.missing_samples["Movies"]), RunStats.MISSING_SAMPLE_SIZE)
+        self.assertEqual(len(stats.stuck_items), 4)
+        self.assertEqual(len(stats.corrupt_items), 4)
+        self.assertEqual(stats.broken_symlinks, 0)
+
+if __name__ == '__main__':
+    unittest.main()
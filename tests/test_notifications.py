@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from discord import Embed
+from omniscan_pkg.notifications import (
+    flush_notifications, format_file_list, get_embed_length, queue_discord_webhook,
+    send_discord_embeds_sync, send_discord_webhook_sync, truncate_field_value,
+)
+
+class TestNotifications(unittest.TestCase):
+    def _send(self, embed):
+        with patch('omniscan_pkg.notifications.get_session') as mock_session:
+            mock_session.return_value.post.return_value = MagicMock(status_code=204)
+            self.assertTrue(send_discord_webhook_sync("https://discord.test/webhook", embed, {}))
+            return mock_session.return_value.post.call_args.kwargs['json']['embeds'][0]
+
+    def test_oversized_embed_keeps_leading_fields_that_fit(self):
+        embed = Embed(title="t" * 200, description="d" * 3000)
+        for i in range(10):
+            embed.add_field(name=f"📁 Library {i}", value="v" * 1000, inline=False)
+
+        sent = self._send(embed)
+        self.assertEqual([f['name'] for f in sent['fields']], ["📁 Library 0", "📁 Library 1"])
+        self.assertIn("truncated", sent['footer']['text'])
+        total = len(sent['title']) + len(sent['description']) + len(sent['footer']['text'])
+        total += sum(len(f['name']) + len(f['value']) for f in sent['fields'])
+        self.assertLessEqual(total, 6000)
+
+    def test_small_embed_sent_unchanged(self):
+        embed = Embed(title="Scan complete", description="All good")
+        embed.add_field(name="Scanned", value="42")
+        sent = self._send(embed)
+        self.assertEqual(sent['fields'][0]['value'], "42")
+        self.assertEqual(get_embed_length(embed), len("Scan complete" + "All good" + "Scanned" + "42"))
+
+    def test_several_embeds_sent_in_one_post(self):
+        with patch('omniscan_pkg.notifications.get_session') as mock_session:
+            mock_session.return_value.post.return_value = MagicMock(status_code=204)
+            embeds = [Embed(title=f"Update {i}", description="x" * 5000 if i == 1 else "ok") for i in range(3)]
+            self.assertTrue(send_discord_embeds_sync("https://discord.test/webhook", embeds, {}))
+            self.assertEqual(mock_session.return_value.post.call_count, 1)
+            sent = mock_session.return_value.post.call_args.kwargs['json']['embeds']
+        self.assertEqual([e['title'] for e in sent], ["Update 0", "Update 1", "Update 2"])
+        self.assertEqual(len(sent[1]['description']), 4096)
+
+    def test_queued_webhooks_sent_in_order(self):
+        with patch('omniscan_pkg.notifications.get_session') as mock_session:
+            mock_session.return_value.post.return_value = MagicMock(status_code=204)
+            for title in ("Scan Started", "Scan Summary"):
+                queue_discord_webhook("https://discord.test/webhook", Embed(title=title), {})
+            self.assertTrue(flush_notifications(timeout=5))
+            titles = [c.kwargs['json']['embeds'][0]['title'] for c in mock_session.return_value.post.call_args_list]
+        self.assertEqual(titles, ["Scan Started", "Scan Summary"])
+
+    def test_truncate_field_value(self):
+        self.assertEqual(truncate_field_value(None), "")
+        self.assertEqual(truncate_field_value(42), "42")
+        self.assertEqual(truncate_field_value("short", 10), "short")
+        self.assertEqual(truncate_field_value("x" * 20, 10), "xxxxxxx...")
+
+    def test_format_file_list(self):
+        self.assertEqual(format_file_list([]), "None")
+        self.assertEqual(format_file_list(["a", "b", "c"], max_items=2), "• a\n• b\n...and 1 more")
+        self.assertEqual(format_file_list(["a", "b"], max_items=2, total=40), "• a\n• b\n...and 38 more")
+        value = format_file_list([f"/media/{i:04d}/" + "x" * 200 for i in range(10)], prefix="+ ", code_block=True, language="diff")
+        self.assertEqual(len(value), 1024)
+        self.assertTrue(value.startswith("```diff\n+ /media/0000/"))
+        self.assertTrue(value.endswith("...\n```"))
+
+if __name__ == '__main__':
+    unittest.main()
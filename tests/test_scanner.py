@@ -1,6 +1,10 @@
 import unittest
 from unittest.mock import MagicMock, patch, mock_open
 import os
+import struct
+import tempfile
+import threading
+import time
 from omniscan_pkg.scanner import PlexScanner
 from omniscan_pkg.models import RunStats, StuckFileTracker
 import logging
@@ -110,35 +114,242 @@ class TestPlexScanner(unittest.TestCase):
         self.assertEqual(stats.total_missing, 1)
         self.assertEqual(len(folders_to_scan), 1)
 
+    def test_scan_directory_reports_dangling_symlinks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, 'movie.mkv'), 'wb') as f:
+                f.write(b'\0')
+            os.symlink(os.path.join(tmp, 'gone.mkv'), os.path.join(tmp, 'dangling.mkv'))
+            self.scanner.library_sections_cache = [{'id': '1', 'title': 'Movies', 'type': 'movie', 'locations': [tmp]}]
+            self.scanner.is_in_library = MagicMock(return_value=False)
+            stats = RunStats(self.config)
+            tracker = MagicMock()
+            tracker.increment_attempt.return_value = False
+            self.scanner.scan_directory(tmp, stats, tracker, set(), threading.Lock())
+        self.assertEqual(stats.broken_symlinks, 1)
+        self.assertEqual(stats.total_missing, 1)
+
+    def test_scan_directory_prunes_housekeeping_and_ignored_dirs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for folder in ('Movie', '@eaDir', 'sample clips'):
+                os.mkdir(os.path.join(tmp, folder))
+                with open(os.path.join(tmp, folder, 'movie.mkv'), 'wb') as f:
+                    f.write(b'\0')
+            self.scanner.library_sections_cache = [{'id': '1', 'title': 'Movies', 'type': 'movie', 'locations': [tmp]}]
+            self.scanner.is_in_library = MagicMock(return_value=True)
+            stats = RunStats(self.config)
+            self.scanner.scan_directory(tmp, stats, MagicMock(), set(), threading.Lock())
+        self.assertEqual(stats.total_scanned, 1)
+
+    def test_scan_directories_drains_shared_queue(self):
+        from collections import deque
+        from concurrent.futures import ThreadPoolExecutor
+        pending = deque(f'/data/Movie {i}' for i in range(20))
+        with patch.object(self.scanner, 'scan_directory') as mock_scan, ThreadPoolExecutor(max_workers=3) as pool:
+            for f in [pool.submit(self.scanner._scan_directories, pending, None, None, set(), None) for _ in range(3)]:
+                f.result()
+        self.assertCountEqual([c.args[0] for c in mock_scan.call_args_list], [f'/data/Movie {i}' for i in range(20)])
+
+    def test_scan_pacer_allows_burst_then_paces(self):
+        self.assertIsNone(self.scanner._get_scan_pacer())
+        self.config.update(SCAN_DELAY=0.5, SCAN_WORKERS=1)
+        pacer = self.scanner._get_scan_pacer()
+        self.assertIs(self.scanner._get_scan_pacer(), pacer)
+        self.assertEqual((pacer.rate, pacer.capacity), (2.0, 8))
+        with patch('omniscan_pkg.scanner.time.sleep') as mock_sleep:
+            for _ in range(8):
+                pacer.acquire()
+            mock_sleep.assert_not_called()
+            pacer.acquire()
+        self.assertAlmostEqual(mock_sleep.call_args.args[0], 0.5, delta=0.05)
+
+    def test_check_file_integrity(self):
+        self.config['INTEGRITY_CHECK'] = True
+        with tempfile.TemporaryDirectory() as tmp:
+            empty = os.path.join(tmp, 'empty.mkv')
+            open(empty, 'wb').close()
+            full = os.path.join(tmp, 'full.mkv')
+            with open(full, 'wb') as f:
+                f.write(b'\0' * 16)
+            self.assertEqual(self.scanner.check_file_integrity(empty), (False, "0-byte file"))
+            self.assertEqual(self.scanner.check_file_integrity(full), (True, None))
+            self.assertEqual(self.scanner.check_file_integrity(os.path.join(tmp, 'gone.mkv')), (False, "file not found"))
+
+    def test_check_files_integrity_order_and_cache(self):
+        self.config.update(INTEGRITY_CHECK=True, FFPROBE_CHECK=True)
+
+        def fake_ffprobe(cmd, **kwargs):
+            bad = cmd[-1].endswith('bad.mkv')
+            return MagicMock(returncode=1 if bad else 0, stderr="Invalid data" if bad else "")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for name in ('a.mkv', 'bad.mkv', 'c.mkv'):
+                paths.append(os.path.join(tmp, name))
+                with open(paths[-1], 'wb') as f:
+                    f.write(b'\0')
+            with patch('omniscan_pkg.scanner.subprocess.run', side_effect=fake_ffprobe) as mock_run:
+                results = self.scanner.check_files_integrity(paths)
+                self.assertEqual(mock_run.call_count, 3)
+                # Unchanged files reuse the cached verdict; a rewritten one is probed again
+                self.assertEqual(self.scanner.check_files_integrity(paths), results)
+                self.assertEqual(mock_run.call_count, 3)
+                with open(paths[1], 'ab') as f:
+                    f.write(b'\0')
+                self.scanner.check_file_integrity(paths[1])
+                self.assertEqual(mock_run.call_count, 4)
+        self.assertEqual(results, [(True, None), (False, "ffprobe error: Invalid data"), (True, None)])
+
+    def test_quick_integrity_check_skips_ffprobe_for_complete_containers(self):
+        self.config.update(INTEGRITY_CHECK=True, FFPROBE_CHECK=True, QUICK_INTEGRITY_CHECK=True)
+        atom = lambda kind, body: struct.pack('>I4s', 8 + len(body), kind) + body
+        mp4 = atom(b'ftyp', b'isom' * 4) + atom(b'moov', b'\0' * 32) + atom(b'mdat', b'\1' * 64)
+        ebml_header = b'\x1a\x45\xdf\xa3\x84' + b'\0' * 4
+        mkv = ebml_header + b'\x18\x53\x80\x67\x88' + b'\0' * 8
+        with tempfile.TemporaryDirectory() as tmp:
+            files = {}
+            for name, data in (('ok.mp4', mp4), ('cut.mp4', mp4[:-10]), ('ok.mkv', mkv), ('cut.mkv', mkv[:-3])):
+                files[name] = os.path.join(tmp, name)
+                with open(files[name], 'wb') as f:
+                    f.write(data)
+            with patch('omniscan_pkg.scanner.subprocess.run', return_value=MagicMock(returncode=0)) as mock_run:
+                for name in ('ok.mp4', 'ok.mkv', 'cut.mp4', 'cut.mkv'):
+                    self.assertEqual(self.scanner.check_file_integrity(files[name]), (True, None))
+            # Only the truncated files were handed to ffprobe
+            self.assertEqual([c.args[0][-1] for c in mock_run.call_args_list], [files['cut.mp4'], files['cut.mkv']])
+
     def test_calculate_missing_files_ignores_broken_symlink(self):
-        self.scanner.library_sections_cache = [{
-            'id': '1',
-            'title': 'Movies',
-            'type': 'movie',
-            'locations': ['/data']
-        }]
-        self.scanner.library_files = {
-            '1': set()
-        }
-        
-        def mock_exists(path):
-            if path == '/data':
-                return True
-            if path == '/data/movie.mkv':
-                return True
-            if path == '/data/broken.mkv':
-                return False
-            return False
-
-        with patch('os.path.exists', side_effect=mock_exists), \
-             patch('os.walk', return_value=[('/data', [], ['movie.mkv', 'broken.mkv'])]), \
-             patch('os.path.islink', side_effect=lambda p: p == '/data/broken.mkv'):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.scanner.library_sections_cache = [{
+                'id': '1',
+                'title': 'Movies',
+                'type': 'movie',
+                'locations': [tmp]
+            }]
+            self.scanner.library_files = {
+                '1': set()
+            }
+            movie = os.path.join(tmp, 'movie.mkv')
+            broken = os.path.join(tmp, 'broken.mkv')
+            open(movie, 'wb').close()
+            os.symlink(os.path.join(tmp, 'gone.mkv'), broken)
             
             missing_cnt = self.scanner.calculate_missing_files_for_library('1')
             
             self.assertEqual(missing_cnt, 1)
-            self.assertIn('/data/movie.mkv', self.scanner.library_missing_files['1'])
-            self.assertNotIn('/data/broken.mkv', self.scanner.library_missing_files['1'])
+            self.assertIn(movie, self.scanner.library_missing_files['1'])
+            self.assertNotIn(broken, self.scanner.library_missing_files['1'])
+
+    def test_cache_all_libraries_fills_every_section(self):
+        self.scanner.library_sections_cache = [{'id': str(i)} for i in range(5)]
+        threads = set()
+
+        def fake_cache(library_id, refresh=False):
+            threads.add(threading.current_thread().name)
+            time.sleep(0.05)
+            self.scanner.library_files[library_id] = {}
+
+        self.scanner.cache_library_files = fake_cache
+        self.scanner._cache_all_libraries()
+        self.assertEqual(sorted(self.scanner.library_files), ['0', '1', '2', '3', '4'])
+        self.assertGreater(len(threads), 1)
+
+    def test_library_path_matching(self):
+        self.scanner.library_sections_cache = [
+            {'id': '1', 'title': 'Media', 'type': 'movie', 'locations': ['/data']},
+            {'id': '2', 'title': 'TV', 'type': 'show', 'locations': ['/data/tv/', '/mnt/tv']},
+        ]
+        # Most specific location wins, trailing slashes are normalized
+        self.assertEqual(self.scanner.get_library_id_for_path('/data/tv/Show/S01/e1.mkv'), ('2', 'TV', 'show'))
+        self.assertEqual(self.scanner.get_library_id_for_path('/data/movies/Heat.mkv'), ('1', 'Media', 'movie'))
+        self.assertEqual(self.scanner.get_library_id_for_path('/data2/file.mkv'), (None, None, None))
+        # A sibling that merely shares a string prefix is not inside the location
+        self.assertEqual(self.scanner.get_library_id_for_path('/mnt/tv2/file.mkv'), (None, None, None))
+        self.assertEqual(self.scanner.get_library_id_for_path('/mnt/tv'), ('2', 'TV', 'show'))
+        self.assertEqual(self.scanner.get_entity_root('/data/tv/Show/S01/e1.mkv'), '/data/tv/Show')
+        self.assertTrue(self.scanner.is_library_root('2', '/mnt/tv/'))
+        self.assertFalse(self.scanner.is_library_root('1', '/mnt/tv'))
+        self.assertTrue(self.scanner.should_scan_directory('/mnt'))
+        self.assertFalse(self.scanner.should_scan_directory('/srv'))
+        # A location at the filesystem root still matches as the least specific library
+        self.scanner.library_sections_cache = self.scanner.library_sections_cache + [
+            {'id': '3', 'title': 'Everything', 'type': 'movie', 'locations': ['/']},
+        ]
+        self.assertEqual(self.scanner.get_library_id_for_path('/srv/file.mkv'), ('3', 'Everything', 'movie'))
+        self.assertEqual(self.scanner.get_library_id_for_path('/data/tv/Show/S01/e2.mkv'), ('2', 'TV', 'show'))
+
+    def test_debounced_scan_dispatched_once_after_last_event(self):
+        self.config['SCAN_DEBOUNCE'] = 0.2
+        with patch.object(self.scanner, '_do_trigger_scan') as mock_trigger:
+            self.scanner.trigger_scan('1', '/data/Show/S01')
+            time.sleep(0.1)
+            self.scanner.trigger_scan('1', '/data/Show/S01/extras')
+            self.scanner.trigger_scan('2', '/data/Other')
+            time.sleep(0.1)
+            mock_trigger.assert_not_called()
+            time.sleep(0.4)
+            self.scanner.scan_monitor_executor.shutdown(wait=True)
+        self.assertCountEqual([c.args[:2] for c in mock_trigger.call_args_list],
+                              [('1', '/data/Show/S01'), ('2', '/data/Other')])
+        self.assertEqual(self.scanner.pending_scans, {})
+
+    def test_ignored_paths_never_queue_scans(self):
+        with patch('omniscan_pkg.scanner.os.path.exists') as mock_exists:
+            self.scanner.trigger_scan('1', '/data/partial.tmp')
+            self.scanner.handle_deletion('/data/sample-clip.mkv')
+        mock_exists.assert_not_called()
+        self.assertEqual(self.scanner.pending_scans, {})
+
+    def test_scan_file_queues_notification_and_scan_together(self):
+        self.scanner.library_sections_cache = [{'id': '1', 'title': 'Movies', 'type': 'movie', 'locations': ['/data']}]
+        self.scanner.is_in_library = MagicMock(return_value=False)
+        tracker = MagicMock()
+        tracker.increment_attempt.return_value = False
+        self.scanner.scan_file('/data/Heat (1995)/Heat.mkv', tracker=tracker)
+        self.assertEqual(self.scanner.pending_notifications['/data/Heat (1995)']['added'], ['/data/Heat (1995)/Heat.mkv'])
+        self.assertIn(('1', '/data/Heat (1995)', None), self.scanner.pending_scans)
+
+    def test_api_fallback_answer_reused_while_cache_warms(self):
+        self.scanner.library_sections_cache = [{'id': '1', 'title': 'Media', 'type': 'movie', 'locations': ['/data']}]
+        with patch.object(self.scanner, '_trigger_cache_fill'), \
+             patch.object(self.scanner, '_is_in_plex_api', return_value=True) as mock_api:
+            self.assertTrue(self.scanner.is_in_library('/data/Heat/Heat.mkv'))
+            self.assertTrue(self.scanner.is_in_library('/data/Heat//Heat.mkv'))
+            self.assertEqual(mock_api.call_count, 1)
+            self.scanner._api_presence_cache.clear()
+            self.assertTrue(self.scanner.is_in_library('/data/Heat/Heat.mkv'))
+            self.assertEqual(mock_api.call_count, 2)
+            # Paths outside every library never reach the API (or its answer cache)
+            self.assertFalse(self.scanner.is_in_library('/downloads/Heat.mkv'))
+            self.assertEqual(mock_api.call_count, 2)
+
+    def test_plex_alert_wakes_every_scan_of_the_section(self):
+        events = [threading.Event(), threading.Event()]
+        self.scanner.active_scan_events['1'] = set(events)
+        self.scanner._on_plex_alert({
+            'notificationName': 'ActivityNotification', 'type': 'library.refresh.section',
+            'state': 'ended', 'Context': {'sectionID': 1},
+        })
+        self.assertTrue(all(event.is_set() for event in events))
+
+    def test_bulk_notification_spills_extra_folders_into_more_embeds(self):
+        self.scanner._send_discord_embed = MagicMock()
+        notifications = [(f'/data/Show {i}', {'added': ['x'], 'deleted': [], 'library_title': 'TV'}) for i in range(45)]
+        self.scanner._send_multi_grouped_notification(notifications)
+        embeds = [c.args[0] for c in self.scanner._send_discord_embed.call_args_list]
+        self.assertEqual([len(e.fields) for e in embeds], [20, 20, 5])
+        self.assertEqual(embeds[2].title, "📂 Bulk Update: 45 folders (3/3)")
+
+    def test_queued_embeds_sent_as_one_message(self):
+        self.config.update(NOTIFICATIONS_ENABLED=True, DISCORD_WEBHOOK_URL='https://discord.test/webhook')
+        with patch('omniscan_pkg.scanner.send_discord_embeds_sync', return_value=True) as mock_send:
+            for i in range(3):
+                self.scanner.send_single_notification(f"Update {i}", "details", None, event_type='update')
+            deadline = time.time() + 5
+            while not mock_send.called and time.time() < deadline:
+                time.sleep(0.05)
+        embeds = mock_send.call_args.args[1]
+        self.assertEqual([e.title for e in embeds], ["Update 0", "Update 1", "Update 2"])
+        self.assertEqual(mock_send.call_args.kwargs['event_type'], 'update')
 
 if __name__ == '__main__':
     unittest.main()